@@ -1,11 +1,22 @@
 # backend/app.py
+import json
 import os
-from flask import Flask, request, jsonify, Response
+from flask import Flask, request, jsonify, Response, stream_with_context, send_file
 from flask_cors import CORS
 from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import select, insert, update, delete, bindparam, tuple_
 from sqlalchemy.orm import joinedload
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 
 from database import db, init_app
+from profiling import init_profiling
+from session_timer import init_session_timer
+# Change tracking for the sync feed; importing it registers the ORM listener.
+from changes import changes_since, reserve, stamp_values, record_deletes, record_reset
+from snapshot import SnapshotError, restore_snapshot, stream_snapshot
+from jobs import init_jobs, JobQueueFull
+from singleflight import init_singleflight
 # Import models and domain helpers. get_eastern_today lives in models so app.py
 # and the streak math share one source of truth for "today" (US Eastern).
 from models import (
@@ -13,10 +24,21 @@ from models import (
     DailyLog,
     ApplicationLog,
     GoalHistory,
+    Job,
     get_settings,
+    get_eastern_today,
+    compute_day_hash,
+    application_fingerprint,
+    find_previous_applications,
+)
+# Column-level Core reads for the hot read endpoints (see read_models.py).
+from read_models import (
     get_current_status,
     get_analytics,
-    get_eastern_today,
+    day_statuses,
+    calendar_days,
+    day_with_applications,
+    export_days,
 )
 
 # Initialize Flask app
@@ -32,10 +54,135 @@ init_app(app)
 # Enable Cross-Origin Resource Sharing (CORS)
 CORS(app)
 
+# Opt-in per-request profiling (no-op unless PROFILE_DIR is set)
+init_profiling(app)
+
+# Heartbeat-driven session timer with write-behind (see session_timer.py)
+session_timer = init_session_timer(app)
+
+# Bounded background job pool for slow operations (see jobs.py)
+job_runner = init_jobs(app)
+
+# Coalesces concurrent identical whole-history reads (see singleflight.py)
+flights = init_singleflight(app)
+
 # --- Database Setup ---
 with app.app_context():
     db.create_all() # This will now create both tables if they don't exist
     get_settings()
+    job_runner.recover()
+
+# --- Day-write helpers ---
+
+def _normalize_applications(applications_list):
+    """ Turns the frontend's application dicts into the (job_name, company,
+    resume_used) tuples that get stored. Malformed entries are skipped rather
+    than failing the whole request; empty strings are stored as NULL. """
+    return [
+        (a.get('jobName') or None, a.get('company') or None, a.get('resume') or None)
+        for a in applications_list
+        if isinstance(a, dict)
+    ]
+
+
+def _stored_applications(log_date):
+    """ The day's stored applications as tuples, in insertion order. """
+    return [
+        tuple(row) for row in db.session.query(
+            ApplicationLog.job_name, ApplicationLog.company, ApplicationLog.resume_used
+        ).filter_by(log_date=log_date).order_by(ApplicationLog.id)
+    ]
+
+
+def _stored_applications_by_day(dates):
+    """ {log_date: stored application tuples} for several days in one query. """
+    stored = {log_date: [] for log_date in dates}
+    if stored:
+        for log_date, *row in db.session.query(
+            ApplicationLog.log_date, ApplicationLog.job_name, ApplicationLog.company, ApplicationLog.resume_used
+        ).filter(ApplicationLog.log_date.in_(stored)).order_by(ApplicationLog.id):
+            stored[log_date].append(tuple(row))
+    return stored
+
+
+def _delete_applications(log_date, extra_seqs=0):
+    """ Bulk-deletes the day's ApplicationLogs and tombstones them for the change
+    feed. Reserves `extra_seqs` more cursor values in the same round trip and
+    returns them. """
+    deleted_ids = db.session.execute(
+        delete(ApplicationLog).where(ApplicationLog.log_date == log_date).returning(ApplicationLog.id)
+    ).scalars().all()
+    seqs = reserve(len(deleted_ids) + extra_seqs)
+    record_deletes(ApplicationLog.__tablename__, deleted_ids, seqs)
+    return seqs
+
+
+def _replace_applications(log_date, app_rows):
+    """ Delete the day's ApplicationLogs and insert `app_rows` in their place.
+    Both are single set-based statements (one DELETE, one executemany INSERT)
+    rather than one statement per application. """
+    seqs = _delete_applications(log_date, extra_seqs=len(app_rows))
+    if app_rows:
+        db.session.execute(insert(ApplicationLog), stamp_values([
+            {"log_date": log_date, "job_name": job_name, "company": company, "resume_used": resume_used}
+            for job_name, company, resume_used in app_rows
+        ], seqs))
+
+
+def _if_match_conflict(log_entry):
+    """ Optimistic concurrency: if the client sent If-Match, it must name the
+    stored version of the day (the ETag we hand out on reads). Returns a 409
+    response on mismatch, or None when the write may proceed. """
+    if_match = request.if_match
+    if not if_match:
+        return None
+    if log_entry is not None and if_match.contains_weak(str(log_entry.version)):
+        return None
+    return jsonify({
+        "error": "Log was modified by another request. Reload and try again.",
+        "version": log_entry.version if log_entry is not None else None,
+    }), 409
+
+
+def _stale_write_response(log_date):
+    """ 409 for a concurrent write that lost the race at commit (version check
+    on UPDATE, or primary-key collision on INSERT). """
+    db.session.rollback()
+    current = db.session.get(DailyLog, log_date)
+    return jsonify({
+        "error": "Log was modified by another request. Reload and try again.",
+        "version": current.version if current is not None else None,
+    }), 409
+
+
+def _duplicate_report(applications, before):
+    """ For each application dict, whether the same role at the same company
+    (see application_fingerprint) was already logged on a day before `before`.
+    Indexes refer to positions in `applications`; non-dict entries are skipped. """
+    fingerprints = [
+        application_fingerprint(a.get('company'), a.get('jobName')) if isinstance(a, dict) else None
+        for a in applications
+    ]
+    previous = find_previous_applications(fingerprints, before)
+    report = []
+    for index, (app_data, fp) in enumerate(zip(applications, fingerprints)):
+        if not isinstance(app_data, dict):
+            continue
+        dates = previous.get(fp, []) if fp else []
+        report.append({
+            "index": index,
+            "jobName": app_data.get('jobName'),
+            "company": app_data.get('company'),
+            "duplicate": bool(dates),
+            "previousDates": dates,
+        })
+    return report
+
+
+def _with_etag(response, version):
+    """ Tag a response with the day's version so clients can send If-Match. """
+    response.set_etag(str(version))
+    return response
 
 # --- API Endpoints ---
 
@@ -59,7 +206,7 @@ def get_state():
     """ Endpoint to get the current application state (unchanged logic). """
     try:
         settings = get_settings()
-        status_data = get_current_status()
+        status_data = flights.do('status', get_current_status)
         return jsonify({"dailyGoal": settings.daily_goal, **status_data})
     except Exception as e:
         app.logger.error(f"Error fetching state: {e}")
@@ -108,24 +255,66 @@ def get_session_data(log_date_str):
             joinedload(DailyLog.applications)
         ).get(log_date)
 
+        # Time from heartbeats that hasn't been flushed yet is newer than the row.
+        buffered = session_timer.peek(log_date)
+        timer = {"elapsed_seconds": buffered[0], "paused": buffered[1]} if buffered else {}
+
         if log_entry:
             # Convert application logs to dictionaries
             applications_data = [a.to_dict() for a in log_entry.applications]
-            return jsonify({
+            return _with_etag(jsonify({
                 "found": True,
                 "log_date": log_entry.log_date.isoformat(),
                 "status": log_entry.status,
                 "completed_count": log_entry.completed_count,
                 "elapsed_seconds": log_entry.elapsed_seconds,
                 "notes": log_entry.notes,
-                "applications": applications_data # Include applications list
-            })
+                "version": log_entry.version,
+                "applications": applications_data, # Include applications list
+                **timer
+            }), log_entry.version)
         else:
-            return jsonify({"found": False}), 404
+            # An unfinished session's timer still resumes after a reload.
+            return jsonify({"found": False, **timer}), 404
     except Exception as e:
         app.logger.error(f"Error fetching session data for {log_date_str}: {e}")
         return jsonify({"error": "Failed to fetch session data"}), 500
 
+# --- Session timer heartbeat ---
+@app.route('/api/session/heartbeat', methods=['POST'])
+def session_heartbeat():
+    """
+    Keeps the server-side timer of the active session running.
+    Accepts JSON: { "paused": <bool>, "logDate": "YYYY-MM-DD" <optional>,
+                    "elapsedSeconds": <int optional, only seeds a new buffer> }
+    Parsed regardless of Content-Type so navigator.sendBeacon() can deliver the
+    final beat when the tab closes. Nothing is written here; see session_timer.py.
+    """
+    today = get_eastern_today()
+    data = request.get_json(force=True, silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Missing request body."}), 400
+
+    try:
+        log_date = date.fromisoformat(data['logDate']) if data.get('logDate') else today
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid logDate format. Use YYYY-MM-DD."}), 400
+    if log_date > today:
+        return jsonify({"error": "logDate cannot be in the future."}), 400
+    try:
+        seed_seconds = int(data.get('elapsedSeconds') or 0)
+        if seed_seconds < 0:
+            raise ValueError("elapsedSeconds cannot be negative.")
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid elapsedSeconds."}), 400
+
+    try:
+        elapsed, paused = session_timer.heartbeat(log_date, bool(data.get('paused')), seed_seconds)
+        return jsonify({"logDate": log_date.isoformat(), "elapsedSeconds": elapsed, "paused": paused}), 200
+    except Exception as e:
+        app.logger.error(f"Error recording session heartbeat: {e}")
+        return jsonify({"error": "Failed to record heartbeat"}), 500
+
 # --- Finish Day (saves applications) ---
 @app.route('/api/finish_day', methods=['POST'])
 def finish_day():
@@ -135,8 +324,12 @@ def finish_day():
         "completedCount": <int>,
         "elapsedSeconds": <int>,
         "applications": [ { "jobName": "...", "company": "...", "resume": "..." }, ... ],
-        "notes": <str optional>
+        "notes": <str optional>,
+        "logDate": "YYYY-MM-DD" <optional, defaults to today>,
+        "annotateDuplicates": <bool optional>
     }
+    "logDate" lets a write queued offline (see frontend/sw.js) land on the day
+    it was recorded even if it is replayed after midnight. It can't be in the future.
     """
     today = get_eastern_today()
     data = request.get_json(silent=True)
@@ -160,55 +353,92 @@ def finish_day():
     if notes is not None and not isinstance(notes, str):
         return jsonify({"error": "'notes' must be a string."}), 400
 
+    log_date = today
+    if data.get('logDate') is not None:
+        try:
+            log_date = date.fromisoformat(data['logDate'])
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid logDate format. Use YYYY-MM-DD."}), 400
+        if log_date > today:
+            return jsonify({"error": "logDate cannot be in the future."}), 400
+
+    app_rows = _normalize_applications(applications_list)
+
     try:
+        # Optional: flag applications already logged on an earlier day.
+        extra = {}
+        if data.get('annotateDuplicates') is True:
+            extra["duplicates"] = [r for r in _duplicate_report(applications_list, log_date) if r["duplicate"]]
+
         settings = get_settings()
         daily_goal = settings.daily_goal
         status = 'complete' if completed_count >= daily_goal else 'incomplete'
 
-        # --- UPSERT DailyLog ---
-        existing_log = DailyLog.query.get(today)
+        existing_log = DailyLog.query.get(log_date)
+        conflict = _if_match_conflict(existing_log)
+        if conflict:
+            return conflict
         was_update = existing_log is not None
+
+        # Notes are only overwritten when sent, so hash what will actually be stored.
+        effective_notes = existing_log.notes if (was_update and notes is None) else notes
+        content_hash = compute_day_hash(status, completed_count, elapsed_seconds, effective_notes, app_rows)
+
+        # --- No-op: identical re-finish (e.g. Finish clicked again after resume) ---
+        if was_update and existing_log.content_hash == content_hash:
+            return _with_etag(jsonify({
+                "message": f"Day log unchanged with status: {status}",
+                "version": existing_log.version,
+                **extra,
+                **get_current_status()
+            }), existing_log.version), 200
+
+        # The finished session's own elapsedSeconds supersedes its heartbeats
+        # (once this commits; a failed write keeps them).
+        session_timer.discard_on_commit(log_date)
+
+        # --- UPSERT DailyLog ---
         if existing_log:
             existing_log.status = status
             existing_log.completed_count = completed_count
             existing_log.elapsed_seconds = elapsed_seconds
-            if notes is not None:
-                existing_log.notes = notes
-            # --- Delete existing ApplicationLogs for this date ---
-            # This ensures the stored applications match the finished session exactly
-            ApplicationLog.query.filter_by(log_date=today).delete()
+            existing_log.notes = effective_notes
+            existing_log.content_hash = content_hash
         else:
             existing_log = DailyLog( # Assign so we can add apps below
-                log_date=today,
+                log_date=log_date,
                 status=status,
                 completed_count=completed_count,
                 elapsed_seconds=elapsed_seconds,
                 notes=notes,
+                content_hash=content_hash,
             )
             db.session.add(existing_log)
 
-        # --- Insert new ApplicationLogs ---
-        for app_data in applications_list:
-            if not isinstance(app_data, dict):
-                # Skip malformed entries rather than crashing the whole request.
-                continue
-            new_app_log = ApplicationLog(
-                log_date=today, # Link to the current day's log
-                job_name=(app_data.get('jobName') or None),
-                company=(app_data.get('company') or None),
-                resume_used=(app_data.get('resume') or None)
-                # 'done' status is implicit, not stored
-            )
-            db.session.add(new_app_log)
+        # --- Replace ApplicationLogs ---
+        # This ensures the stored applications match the finished session exactly
+        # ('done' status is implicit, not stored).
+        _replace_applications(log_date, app_rows)
 
+        # The new version is assigned at flush; reading it after commit would
+        # reload the expired row.
+        db.session.flush()
+        version = existing_log.version
         db.session.commit()
 
         status_data = get_current_status()
-        return jsonify({
+        return _with_etag(jsonify({
             "message": f"Day log {'updated' if was_update else 'created'} successfully with status: {status}",
+            "version": version,
+            **extra,
             **status_data
-        }), 200 # Use 200 OK for update/create consistency here
+        }), version), 200 # Use 200 OK for update/create consistency here
 
+    except StaleDataError:
+        return _stale_write_response(log_date)
+    except IntegrityError:
+        # Lost the race to create the day's row: another request inserted it first.
+        return _stale_write_response(log_date)
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Error finishing day: {e}")
@@ -228,12 +458,7 @@ def get_calendar_data():
     try:
         start_date = date(year, month, 1)
         end_date = date(year, month + 1, 1) if month < 12 else date(year + 1, 1, 1)
-        logs = DailyLog.query.filter( DailyLog.log_date >= start_date, DailyLog.log_date < end_date ).all()
-        logged_days_status = [
-            {"date": log.log_date.isoformat(), "status": log.status, "completedCount": log.completed_count}
-            for log in logs
-        ]
-        return jsonify({"loggedDaysStatus": logged_days_status})
+        return jsonify({"loggedDaysStatus": calendar_days(start_date, end_date)})
     except Exception as e:
         app.logger.error(f"Error fetching calendar data: {e}")
         return jsonify({"error": "Failed to fetch calendar data"}), 500
@@ -248,26 +473,73 @@ def get_logs_for_date(log_date_str):
         return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
 
     try:
-        # Query ApplicationLog directly for the given date
-        app_logs = ApplicationLog.query.filter_by(log_date=log_date).order_by(ApplicationLog.timestamp).all()
-        applications_data = [a.to_dict() for a in app_logs]
-
-        # Also fetch the summary status for context
-        daily_log_summary = DailyLog.query.get(log_date)
+        # The day's summary (for context) and its applications in one query
+        daily_log_summary, applications_data = day_with_applications(log_date)
         log_status = daily_log_summary.status if daily_log_summary else None
         notes = daily_log_summary.notes if daily_log_summary else None
+        version = daily_log_summary.version if daily_log_summary else None
 
-        return jsonify({
+        response = jsonify({
             "log_date": log_date_str,
             "status": log_status,
             "notes": notes,
+            "version": version,
             "applications": applications_data
         })
+        return _with_etag(response, version) if daily_log_summary else response
     except Exception as e:
         app.logger.error(f"Error fetching logs for {log_date_str}: {e}")
         return jsonify({"error": "Failed to fetch logs for date"}), 500
 
 
+# --- Duplicate application lookup ---
+def _parse_before(value):
+    """ Optional cutoff date for duplicate lookups; defaults to today so the
+    current session's own (already finished) rows don't count. """
+    return date.fromisoformat(value) if value else get_eastern_today()
+
+
+@app.route('/api/applications/lookup', methods=['GET'])
+def lookup_application():
+    """ Has this role at this company been logged before?
+    Query params: company, jobName, before=YYYY-MM-DD (optional). """
+    company = request.args.get('company', '')
+    job_name = request.args.get('jobName', '')
+    if not company.strip() or not job_name.strip():
+        return jsonify({"error": "Both 'company' and 'jobName' are required."}), 400
+    try:
+        before = _parse_before(request.args.get('before'))
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+    try:
+        (result,) = _duplicate_report([{"company": company, "jobName": job_name}], before)
+        del result["index"]
+        return jsonify(result), 200
+    except Exception as e:
+        app.logger.error(f"Error looking up application: {e}")
+        return jsonify({"error": "Failed to look up application"}), 500
+
+
+@app.route('/api/applications/lookup', methods=['POST'])
+def lookup_applications_batch():
+    """ Batch variant: { "applications": [ {"jobName", "company"}, ... ],
+    "before": "YYYY-MM-DD" <optional> }. Checks the whole list in one query. """
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data.get('applications'), list):
+        return jsonify({"error": "'applications' must be a list."}), 400
+    if len(data['applications']) > 1000:
+        return jsonify({"error": "At most 1000 applications per lookup."}), 400
+    try:
+        before = _parse_before(data.get('before'))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+    try:
+        return jsonify({"results": _duplicate_report(data['applications'], before)}), 200
+    except Exception as e:
+        app.logger.error(f"Error looking up applications: {e}")
+        return jsonify({"error": "Failed to look up applications"}), 500
+
+
 # --- NEW: Edit a past day's log (count / applications / notes) ---
 @app.route('/api/logs/<string:log_date_str>', methods=['PUT'])
 def update_logs_for_date(log_date_str):
@@ -289,47 +561,65 @@ def update_logs_for_date(log_date_str):
     log_entry = DailyLog.query.get(log_date)
     if not log_entry:
         return jsonify({"error": "No log exists for that date."}), 404
+    conflict = _if_match_conflict(log_entry)
+    if conflict:
+        return conflict
 
+    completed_count = log_entry.completed_count
+    elapsed_seconds = log_entry.elapsed_seconds
     try:
         if 'completedCount' in data:
-            cc = int(data['completedCount'])
-            if cc < 0:
+            completed_count = int(data['completedCount'])
+            if completed_count < 0:
                 raise ValueError("completedCount cannot be negative.")
-            log_entry.completed_count = cc
         if 'elapsedSeconds' in data:
-            es = int(data['elapsedSeconds'])
-            if es < 0:
+            elapsed_seconds = int(data['elapsedSeconds'])
+            if elapsed_seconds < 0:
                 raise ValueError("elapsedSeconds cannot be negative.")
-            log_entry.elapsed_seconds = es
     except (TypeError, ValueError):
         return jsonify({"error": "Invalid completedCount or elapsedSeconds."}), 400
 
+    notes = log_entry.notes
     if 'notes' in data:
         if data['notes'] is not None and not isinstance(data['notes'], str):
             return jsonify({"error": "'notes' must be a string."}), 400
-        log_entry.notes = data['notes']
+        notes = data['notes']
 
+    app_rows = None
     if 'applications' in data:
         if not isinstance(data['applications'], list):
             return jsonify({"error": "'applications' must be a list."}), 400
-        ApplicationLog.query.filter_by(log_date=log_date).delete()
-        for app_data in data['applications']:
-            if not isinstance(app_data, dict):
-                continue
-            db.session.add(ApplicationLog(
-                log_date=log_date,
-                job_name=(app_data.get('jobName') or None),
-                company=(app_data.get('company') or None),
-                resume_used=(app_data.get('resume') or None),
-            ))
+        app_rows = _normalize_applications(data['applications'])
 
     try:
         # Recompute status against the current goal.
         settings = get_settings()
-        log_entry.status = 'complete' if log_entry.completed_count >= settings.daily_goal else 'incomplete'
+        status = 'complete' if completed_count >= settings.daily_goal else 'incomplete'
+        content_hash = compute_day_hash(
+            status, completed_count, elapsed_seconds, notes,
+            app_rows if app_rows is not None else _stored_applications(log_date),
+        )
+        if log_entry.content_hash == content_hash:
+            return _with_etag(jsonify({"message": "Log unchanged.", **log_entry.to_dict(),
+                                       **get_current_status()}), log_entry.version), 200
+
+        if 'elapsedSeconds' in data:
+            session_timer.discard_on_commit(log_date)
+        log_entry.status = status
+        log_entry.completed_count = completed_count
+        log_entry.elapsed_seconds = elapsed_seconds
+        log_entry.notes = notes
+        log_entry.content_hash = content_hash
+        if app_rows is not None:
+            _replace_applications(log_date, app_rows)
+        # Serialize while the flushed row is still loaded (commit expires it).
+        db.session.flush()
+        updated = log_entry.to_dict()
         db.session.commit()
-        return jsonify({"message": "Log updated.", **log_entry.to_dict(),
-                        **get_current_status()}), 200
+        return _with_etag(jsonify({"message": "Log updated.", **updated,
+                                   **get_current_status()}), updated["version"]), 200
+    except StaleDataError:
+        return _stale_write_response(log_date)
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Error updating logs for {log_date_str}: {e}")
@@ -351,8 +641,10 @@ def delete_logs_for_date(log_date_str):
         return jsonify({"error": "No log exists for that date."}), 404
 
     try:
-        # cascade="all, delete-orphan" on DailyLog.applications removes the
-        # child ApplicationLog rows when the parent is deleted.
+        # Remove the children in one statement; the cascade="all, delete-orphan"
+        # on DailyLog.applications would otherwise load and delete them one by one.
+        session_timer.discard_on_commit(log_date)
+        _delete_applications(log_date)
         db.session.delete(log_entry)
         db.session.commit()
         return jsonify({"message": f"Log for {log_date_str} deleted.",
@@ -363,13 +655,219 @@ def delete_logs_for_date(log_date_str):
         return jsonify({"error": "Failed to delete log."}), 500
 
 
+# --- Batch edit: create / edit / delete many days at once ---
+MAX_BATCH_DAYS = 1000
+
+
+def _parse_day_edit(entry, today):
+    """ Validates one entry of a PATCH /api/logs body. Returns (edit, None) or
+    (None, error message); only the fields that were sent end up in the edit. """
+    if not isinstance(entry, dict):
+        return None, "Each entry must be an object."
+    try:
+        log_date = date.fromisoformat(entry.get('date'))
+    except (TypeError, ValueError):
+        return None, "Invalid date format. Use YYYY-MM-DD."
+    if log_date > today:
+        return None, "date cannot be in the future."
+    version = entry.get('version')
+    if version is not None and (isinstance(version, bool) or not isinstance(version, int)):
+        return None, "'version' must be an integer."
+
+    edit = {"date": log_date, "version": version, "delete": entry.get('delete') is True}
+    if edit["delete"]:
+        return edit, None
+    try:
+        for key in ('completedCount', 'elapsedSeconds'):
+            if key in entry:
+                edit[key] = int(entry[key])
+                if edit[key] < 0:
+                    raise ValueError(f"{key} cannot be negative.")
+    except (TypeError, ValueError):
+        return None, "Invalid completedCount or elapsedSeconds."
+    if 'notes' in entry:
+        if entry['notes'] is not None and not isinstance(entry['notes'], str):
+            return None, "'notes' must be a string."
+        edit['notes'] = entry['notes']
+    if 'applications' in entry:
+        if not isinstance(entry['applications'], list):
+            return None, "'applications' must be a list."
+        edit['applications'] = _normalize_applications(entry['applications'])
+    return edit, None
+
+
+@app.route('/api/logs', methods=['PATCH'])
+def batch_update_logs():
+    """
+    Creates, edits and deletes many days in one request and one transaction.
+    Accepts JSON: { "days": [
+        { "date": "YYYY-MM-DD", "completedCount": <int>, "elapsedSeconds": <int>,
+          "notes": <str>, "applications": [ {...} ], "version": <int optional> },
+        { "date": "YYYY-MM-DD", "delete": true, "version": <int optional> },
+        ...
+    ] }
+    An entry for an existing day edits the fields it sends, like PUT
+    /api/logs/<date>; for a new day it creates it (completedCount defaults to the
+    number of applications, everything else to empty). "version" makes an entry
+    conditional, like If-Match. Either every entry applies or none does; errors
+    name the offending entry's "index". Streaks are recomputed once at the end.
+    """
+    today = get_eastern_today()
+    data = request.get_json(silent=True)
+    entries = data.get('days') if isinstance(data, dict) else None
+    if not isinstance(entries, list) or not entries:
+        return jsonify({"error": "'days' must be a non-empty list."}), 400
+    if len(entries) > MAX_BATCH_DAYS:
+        return jsonify({"error": f"At most {MAX_BATCH_DAYS} days per request."}), 400
+
+    edits = {}
+    for index, entry in enumerate(entries):
+        edit, error = _parse_day_edit(entry, today)
+        if edit is not None and edit["date"] in edits:
+            error = "Each date may appear only once."
+        if error:
+            return jsonify({"error": error, "index": index}), 400
+        edit["index"] = index
+        edits[edit["date"]] = edit
+
+    days = DailyLog.__table__
+    try:
+        settings = get_settings()
+        # Day rows are read and written with Core statements: the ORM would issue
+        # one version-checked UPDATE per day. FOR UPDATE keeps the loaded
+        # versions current until commit (SQLite ignores it but serializes
+        # writers; the rowcount check below covers the window before our first write).
+        existing = {row.log_date: row for row in db.session.execute(
+            select(days.c.log_date, days.c.completed_count, days.c.elapsed_seconds,
+                   days.c.notes, days.c.content_hash, days.c.version)
+            .where(days.c.log_date.in_(list(edits))).with_for_update()
+        )}
+        for log_date, edit in edits.items():
+            row = existing.get(log_date)
+            if edit["delete"] and row is None:
+                return jsonify({"error": "No log exists for that date.", "index": edit["index"]}), 404
+            if edit["version"] is not None and (row is None or row.version != edit["version"]):
+                return jsonify({
+                    "error": "Log was modified by another request. Reload and try again.",
+                    "index": edit["index"],
+                    "version": row.version if row is not None else None,
+                }), 409
+
+        # Edits that keep their applications still hash them (one query for all).
+        stored = _stored_applications_by_day([
+            d for d, edit in edits.items()
+            if d in existing and not edit["delete"] and 'applications' not in edit
+        ])
+
+        results = {}    # log_date -> (result, version)
+        created, updated, deleted = [], [], []
+        replaced = {}   # log_date -> new application rows
+        for log_date, edit in edits.items():
+            row = existing.get(log_date)
+            if edit["delete"]:
+                deleted.append(log_date)
+                results[log_date] = ("deleted", None)
+                continue
+            app_rows = edit.get('applications')
+            if row is None:
+                app_rows = app_rows if app_rows is not None else []
+                completed_count = edit.get('completedCount', len(app_rows))
+                elapsed_seconds = edit.get('elapsedSeconds', 0)
+                notes = edit.get('notes')
+            else:
+                completed_count = edit.get('completedCount', row.completed_count)
+                elapsed_seconds = edit.get('elapsedSeconds', row.elapsed_seconds)
+                notes = edit.get('notes', row.notes)
+            status = 'complete' if completed_count >= settings.daily_goal else 'incomplete'
+            values = {
+                "status": status,
+                "completed_count": completed_count,
+                "elapsed_seconds": elapsed_seconds,
+                "notes": notes,
+                "content_hash": compute_day_hash(
+                    status, completed_count, elapsed_seconds, notes,
+                    app_rows if app_rows is not None else stored[log_date],
+                ),
+            }
+            if row is not None and row.content_hash == values["content_hash"]:
+                results[log_date] = ("unchanged", row.version)
+                continue
+
+            if row is None:
+                created.append({"log_date": log_date, "version": 1, **values})
+                results[log_date] = ("created", 1)
+            else:
+                updated.append({"b_date": log_date, "b_version": row.version, "version": row.version + 1, **values})
+                results[log_date] = ("updated", row.version + 1)
+            if app_rows is not None:
+                replaced[log_date] = app_rows
+            if 'elapsedSeconds' in edit:
+                session_timer.discard_on_commit(log_date)
+        for log_date in deleted:
+            session_timer.discard_on_commit(log_date)
+
+        # --- Bulk writes: one statement per kind, however many days ---
+        deleted_ids = []
+        if replaced or deleted:
+            deleted_ids = db.session.execute(
+                delete(ApplicationLog).where(ApplicationLog.log_date.in_(list(replaced) + deleted))
+                .returning(ApplicationLog.id)
+            ).scalars().all()
+        new_apps = [
+            {"log_date": log_date, "job_name": job_name, "company": company, "resume_used": resume_used}
+            for log_date, app_rows in replaced.items()
+            for job_name, company, resume_used in app_rows
+        ]
+        seqs = reserve(len(deleted_ids) + len(deleted) + len(created) + len(updated) + len(new_apps))
+        record_deletes(ApplicationLog.__tablename__, deleted_ids, seqs)
+        if updated:
+            changed_rows = db.session.execute(
+                update(days).where(days.c.log_date == bindparam('b_date'),
+                                   days.c.version == bindparam('b_version')),
+                stamp_values(updated, seqs),
+            ).rowcount
+            if db.session.get_bind().dialect.supports_sane_multi_rowcount and changed_rows != len(updated):
+                raise StaleDataError("A day changed concurrently.")
+        if created:
+            db.session.execute(insert(days), stamp_values(created, seqs))
+        if deleted:
+            removed = db.session.execute(delete(days).where(
+                tuple_(days.c.log_date, days.c.version).in_([(d, existing[d].version) for d in deleted])
+            )).rowcount
+            if removed != len(deleted):
+                raise StaleDataError("A deleted day changed concurrently.")
+            record_deletes(DailyLog.__tablename__, [d.isoformat() for d in deleted], seqs)
+        if new_apps:
+            db.session.execute(insert(ApplicationLog), stamp_values(new_apps, seqs))
+        db.session.commit()
+
+        day_results = [
+            {"date": log_date.isoformat(), "result": result, "version": version}
+            for log_date, (result, version) in results.items()
+        ]
+        changed = sum(1 for r in day_results if r["result"] != "unchanged")
+        return jsonify({
+            "message": f"{changed} of {len(day_results)} days changed.",
+            "days": day_results,
+            **get_current_status()
+        }), 200
+    except (StaleDataError, IntegrityError):
+        # A concurrent write touched one of the days: nothing was applied.
+        db.session.rollback()
+        return jsonify({"error": "A log was modified by another request. Reload and try again."}), 409
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error applying batch log edit: {e}")
+        return jsonify({"error": "Failed to update logs."}), 500
+
+
 # --- NEW: Analytics summary ---
 @app.route('/api/analytics', methods=['GET'])
 def analytics():
     """ Aggregate stats across all logged days (totals, averages, completion
     rate, best day, longest streak, per-weekday breakdown). """
     try:
-        return jsonify(get_analytics()), 200
+        return jsonify(flights.do('analytics', get_analytics)), 200
     except Exception as e:
         app.logger.error(f"Error computing analytics: {e}")
         return jsonify({"error": "Failed to compute analytics"}), 500
@@ -387,15 +885,22 @@ def goal_history():
         return jsonify({"error": "Failed to fetch goal history"}), 500
 
 
+def _reset_all():
+    """ Deletes all user data in the current transaction (caller commits). """
+    session_timer.discard_on_commit()
+    # Order matters due to foreign key constraint: delete applications first
+    db.session.query(ApplicationLog).delete()
+    db.session.query(DailyLog).delete()
+    db.session.query(GoalHistory).delete()
+    db.session.query(Setting).delete()
+    record_reset()
+
+
 @app.route('/api/reset', methods=['DELETE'])
 def reset_data():
     """ Endpoint to delete all logs and reset settings. """
     try:
-        # Order matters due to foreign key constraint: delete applications first
-        db.session.query(ApplicationLog).delete()
-        db.session.query(DailyLog).delete()
-        db.session.query(GoalHistory).delete()
-        db.session.query(Setting).delete()
+        _reset_all()
         db.session.commit()
         get_settings()
         return jsonify({"message": "All data reset successfully"}), 200
@@ -404,6 +909,41 @@ def reset_data():
         app.logger.error(f"Failed to reset data: {e}")
         return jsonify({"error": "Failed to reset data", "details": str(e)}), 500
 
+def _write_export_csv(export_data, out, on_day=None):
+    """ Writes export_days() output as CSV to a text file object. Calls
+    on_day(index) after each day (background jobs report progress with it). """
+    import csv
+    writer = csv.writer(out)
+    # Flatten for CSV: one row per application, include day info
+    writer.writerow([
+        'log_date', 'status', 'completed_count', 'elapsed_seconds', 'notes',
+        'jobName', 'company', 'resume'
+    ])
+    for index, log in enumerate(export_data):
+        if log['applications']:
+            for app_row in log['applications']:
+                writer.writerow([
+                    log['log_date'], log['status'], log['completed_count'], log['elapsed_seconds'],
+                    log.get('notes', '') or '',
+                    app_row.get('jobName', ''), app_row.get('company', ''), app_row.get('resume', '')
+                ])
+        else:
+            # No applications for this day
+            writer.writerow([
+                log['log_date'], log['status'], log['completed_count'], log['elapsed_seconds'],
+                log.get('notes', '') or '', '', '', ''
+            ])
+        if on_day:
+            on_day(index)
+
+
+def _export_csv_text(export_data):
+    from io import StringIO
+    si = StringIO()
+    _write_export_csv(export_data, si)
+    return si.getvalue()
+
+
 @app.route('/api/export_logs', methods=['GET'])
 def export_logs():
     """
@@ -411,46 +951,13 @@ def export_logs():
     Query param: ?format=csv or ?format=json (default: json)
     """
     format = request.args.get('format', 'json').lower()
-    # Fetch all logs, order by date
-    logs = DailyLog.query.order_by(DailyLog.log_date).all()
-    export_data = []
-    for log in logs:
-        applications = [a.to_dict() for a in log.applications]
-        export_data.append({
-            'log_date': log.log_date.isoformat(),
-            'status': log.status,
-            'completed_count': log.completed_count,
-            'elapsed_seconds': log.elapsed_seconds,
-            'notes': log.notes,
-            'applications': applications
-        })
+    # Fetch all logs, order by date, with every day's applications from one
+    # extra query instead of one lazy load per day. Concurrent exports share
+    # one read (and one CSV rendering).
+    export_data = flights.do('export', export_days)
 
     if format == 'csv':
-        # Flatten for CSV: one row per application, include day info
-        import csv
-        from io import StringIO
-        si = StringIO()
-        writer = csv.writer(si)
-        # Header
-        writer.writerow([
-            'log_date', 'status', 'completed_count', 'elapsed_seconds', 'notes',
-            'jobName', 'company', 'resume'
-        ])
-        for log in export_data:
-            if log['applications']:
-                for app_row in log['applications']:
-                    writer.writerow([
-                        log['log_date'], log['status'], log['completed_count'], log['elapsed_seconds'],
-                        log.get('notes', '') or '',
-                        app_row.get('jobName', ''), app_row.get('company', ''), app_row.get('resume', '')
-                    ])
-            else:
-                # No applications for this day
-                writer.writerow([
-                    log['log_date'], log['status'], log['completed_count'], log['elapsed_seconds'],
-                    log.get('notes', '') or '', '', '', ''
-                ])
-        output = si.getvalue()
+        output = flights.do('export.csv', lambda: _export_csv_text(export_data))
         return Response(
             output,
             mimetype='text/csv',
@@ -462,6 +969,169 @@ def export_logs():
         # Default: JSON
         return jsonify(export_data), 200
 
+# --- Binary snapshot / restore ---
+def _snapshot_chunks():
+    return stream_snapshot(db.engine)
+
+
+def _snapshot_filename():
+    return f"jobtracker-{get_eastern_today().isoformat()}.snapshot"
+
+
+@app.route('/api/snapshot', methods=['GET'])
+def get_snapshot():
+    """ Streams a compressed, checksummed snapshot of all data (see snapshot.py).
+    Save it as-is and POST it back to /api/restore. """
+    return Response(stream_with_context(_snapshot_chunks()), mimetype='application/octet-stream',
+                    headers={'Content-Disposition': f'attachment; filename={_snapshot_filename()}'})
+
+
+@app.route('/api/restore', methods=['POST'])
+def restore():
+    """ Replaces ALL data with a file from GET /api/snapshot, atomically: the
+    request body is the raw file. A corrupt or truncated file changes nothing. """
+    try:
+        session_timer.discard_on_commit()
+        restored = restore_snapshot(request.stream)
+        db.session.commit()
+        get_settings()
+        return jsonify({"message": "Snapshot restored.", "restored": restored,
+                        **get_current_status()}), 200
+    except SnapshotError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Snapshot is inconsistent (duplicate or orphaned rows)."}), 400
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Failed to restore snapshot: {e}")
+        return jsonify({"error": "Failed to restore snapshot"}), 500
+
+
+# --- Background jobs (see jobs.py) ---
+def _export_params(params):
+    export_format = str(params.get('format', 'json')).lower()
+    if export_format not in ('json', 'csv'):
+        raise ValueError("'format' must be 'json' or 'csv'.")
+    return {"format": export_format}
+
+
+@job_runner.kind('export', validate=_export_params)
+def _export_job(ctx):
+    """ export_logs, written to a file. """
+    export_data = flights.do('export', export_days)
+    ctx.progress(0.5)
+    if ctx.params['format'] == 'csv':
+        total = len(export_data)
+        with open(ctx.result_path, 'w', newline='', encoding='utf-8') as out:
+            _write_export_csv(export_data, out, on_day=lambda i: ctx.progress(0.5 + 0.5 * (i + 1) / total))
+        return 'jobtracker_logs.csv', 'text/csv'
+    with open(ctx.result_path, 'w', encoding='utf-8') as out:
+        json.dump(export_data, out, indent=2)
+    return 'jobtracker_logs.json', 'application/json'
+
+
+@job_runner.kind('snapshot')
+def _snapshot_job(ctx):
+    """ GET /api/snapshot, written to a file. """
+    with open(ctx.result_path, 'wb') as out:
+        for chunk in _snapshot_chunks():
+            out.write(chunk)
+            ctx.check_cancelled()
+    return _snapshot_filename(), 'application/octet-stream'
+
+
+@job_runner.kind('reset')
+def _reset_job(ctx):
+    """ DELETE /api/reset. Cancellable until it commits. """
+    _reset_all()
+    ctx.check_cancelled()
+    db.session.commit()
+    get_settings()
+
+
+@app.route('/api/jobs/<string:kind>', methods=['POST'])
+def submit_job(kind):
+    """ Starts a background job and returns it (202) without waiting.
+    Kinds: "export" ({"format": "json"|"csv"}), "snapshot", "reset".
+    Poll GET /api/jobs/<id>; download the file from its "resultUrl". """
+    if kind not in job_runner.kinds:
+        return jsonify({"error": f"Unknown job kind. Use one of: {', '.join(job_runner.kinds)}."}), 404
+    params = request.get_json(silent=True) or {}
+    if not isinstance(params, dict):
+        return jsonify({"error": "Job parameters must be an object."}), 400
+    try:
+        job = job_runner.submit(kind, params)
+    except JobQueueFull:
+        return jsonify({"error": "Too many jobs are queued. Try again shortly."}), 429
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error starting {kind} job: {e}")
+        return jsonify({"error": "Failed to start job"}), 500
+    response = jsonify(job.to_dict())
+    response.headers['Location'] = f"/api/jobs/{job.id}"
+    return response, 202
+
+
+@app.route('/api/jobs/<string:job_id>', methods=['GET'])
+def get_job(job_id):
+    """ A job's status and progress (0.0 - 1.0). """
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify({"error": "No such job."}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@app.route('/api/jobs/<string:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """ Cancels a queued job, or asks a running one to stop at its next
+    progress check. Finished jobs are returned unchanged. """
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify({"error": "No such job."}), 404
+    try:
+        return jsonify(job_runner.cancel(job).to_dict()), 200
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error cancelling job {job_id}: {e}")
+        return jsonify({"error": "Failed to cancel job"}), 500
+
+
+@app.route('/api/jobs/<string:job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """ Downloads a finished job's result file. """
+    job = db.session.get(Job, job_id)
+    if job is None or job.status != 'succeeded' or not job.result_path or not os.path.exists(job.result_path):
+        return jsonify({"error": "No result available for this job."}), 404
+    return send_file(job.result_path, mimetype=job.result_type, as_attachment=True,
+                     download_name=job.result_name)
+
+
+# --- Incremental change feed ---
+@app.route('/api/changes', methods=['GET'])
+def get_changes():
+    """ Rows created, modified or deleted since a cursor, oldest first.
+    Query params: since=<cursor> (default 0 = everything), limit=<1-1000> (default 500).
+    Returns { "changes": [...], "cursor": <resume from here>, "hasMore": <bool> }.
+    Each change is an "upsert" (with the row's current "data"), a "delete", or a
+    "reset" (entity "*": all data was wiped, drop the local copy). """
+    try:
+        since = int(request.args.get('since', 0))
+        limit = int(request.args.get('limit', 500))
+        if since < 0 or not (1 <= limit <= 1000):
+            raise ValueError("out of range")
+    except (TypeError, ValueError):
+        return jsonify({"error": "'since' must be a cursor >= 0 and 'limit' between 1 and 1000."}), 400
+    try:
+        return jsonify(changes_since(since, limit)), 200
+    except Exception as e:
+        app.logger.error(f"Error reading change feed: {e}")
+        return jsonify({"error": "Failed to read changes"}), 500
+
+
 @app.route('/api/server_time', methods=['GET'])
 def get_server_time():
     """ Current time in US Eastern. """
@@ -484,11 +1154,11 @@ def get_server_time():
 
 @app.route('/api/debug_streaks', methods=['GET'])
 def debug_streaks():
-    logs = DailyLog.query.order_by(DailyLog.log_date).all()
+    logs = day_statuses()
     log_list = [
-        {"log_date": log.log_date.isoformat(), "status": log.status} for log in logs
+        {"log_date": log_date.isoformat(), "status": status} for log_date, status, _version, _cursor in logs
     ]
-    streaks = get_current_status()
+    streaks = get_current_status(logs)
     return {
         # Use the shared Eastern helper so this matches the streak logic instead
         # of the container's local clock (previously used date.today()).
@@ -0,0 +1,151 @@
+# backend/changes.py
+"""
+Change tracking and the incremental change feed (GET /api/changes).
+
+Every row of the synced tables (daily_logs, application_logs, goal_history,
+settings) carries `change_seq`, the cursor value of its last write, and
+`updated_at`. Deleted rows leave a Tombstone with its own cursor value. The
+cursor comes from a single counter row (models.ChangeCounter) that writers
+advance with one UPDATE ... RETURNING: the row lock is held until commit, so
+values become visible in increasing order and a client that saw cursor N
+never misses a change <= N.
+
+ORM writes are stamped automatically in a before_flush listener. The Core bulk
+paths (application replace, the session timer flush, day delete, reset) can't
+be seen by it and call reserve() / stamp_values() / record_deletes() /
+record_reset() themselves.
+
+A client syncs by calling GET /api/changes?since=<cursor> and repeating with
+the returned cursor while hasMore is true; since=0 pages through everything.
+The cost of a page depends only on its size: each table is read through its
+change_seq index.
+"""
+from datetime import datetime
+
+from sqlalchemy import event, insert, update
+
+from database import db
+from models import Setting, DailyLog, ApplicationLog, GoalHistory, ChangeCounter, Tombstone
+
+_counter = ChangeCounter.__table__
+
+# table name -> (model, function giving the row's key as text)
+TRACKED = {
+    DailyLog.__tablename__: (DailyLog, lambda row: row.log_date.isoformat()),
+    ApplicationLog.__tablename__: (ApplicationLog, lambda row: str(row.id)),
+    GoalHistory.__tablename__: (GoalHistory, lambda row: str(row.id)),
+    Setting.__tablename__: (Setting, lambda row: row.key),
+}
+_TRACKED_MODELS = tuple(model for model, _key in TRACKED.values())
+
+
+def allocate(connection, count):
+    """ Reserves `count` consecutive cursor values; returns the first. """
+    last = connection.execute(
+        update(_counter).where(_counter.c.id == 1)
+        .values(value=_counter.c.value + count)
+        .returning(_counter.c.value)
+    ).scalar_one()
+    return last - count + 1
+
+
+def reserve(count):
+    """ Cursor values for Core writes in the current transaction, as an
+    iterator; reserve once and pass it to several calls to save round trips. """
+    first = allocate(db.session.connection(), count) if count else 0
+    return iter(range(first, first + count))
+
+
+def stamp_values(rows, seqs=None):
+    """ Adds change_seq/updated_at to dicts about to be bulk inserted
+    (in place; also returns them). """
+    if seqs is None:
+        seqs = reserve(len(rows))
+    now = datetime.utcnow()
+    for row in rows:
+        row["change_seq"] = next(seqs)
+        row["updated_at"] = now
+    return rows
+
+
+def record_deletes(entity, keys, seqs=None):
+    """ Tombstones rows removed by a bulk DELETE. `keys` as in TRACKED. """
+    if not keys:
+        return
+    if seqs is None:
+        seqs = reserve(len(keys))
+    now = datetime.utcnow()
+    db.session.execute(insert(Tombstone), [
+        {"entity": entity, "entity_key": str(key), "change_seq": next(seqs), "deleted_at": now}
+        for key in keys
+    ])
+
+
+def record_reset():
+    """ A reset wipes everything, so one '*' tombstone replaces all others. """
+    db.session.query(Tombstone).delete()
+    first = allocate(db.session.connection(), 1)
+    db.session.add(Tombstone(entity='*', entity_key='*', change_seq=first))
+
+
+@event.listens_for(db.session, 'before_flush')
+def _stamp_orm_changes(session, _flush_context, _instances):
+    changed = [obj for obj in session.new if isinstance(obj, _TRACKED_MODELS)]
+    changed += [obj for obj in session.dirty
+                if isinstance(obj, _TRACKED_MODELS) and session.is_modified(obj, include_collections=False)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, _TRACKED_MODELS)]
+    if not changed and not deleted:
+        return
+    seq = allocate(session.connection(), len(changed) + len(deleted))
+    now = datetime.utcnow()
+    for obj in changed:
+        obj.change_seq = seq
+        obj.updated_at = now
+        seq += 1
+    for obj in deleted:
+        _model, key = TRACKED[obj.__tablename__]
+        session.add(Tombstone(entity=obj.__tablename__, entity_key=key(obj), change_seq=seq, deleted_at=now))
+        seq += 1
+
+
+def _serialize(table, row):
+    if table == DailyLog.__tablename__:
+        return row.to_dict()
+    if table == ApplicationLog.__tablename__:
+        return {**row.to_dict(), "log_date": row.log_date.isoformat()}
+    if table == GoalHistory.__tablename__:
+        return {**row.to_dict(), "id": row.id}
+    return {"key": row.key, "dailyGoal": row.daily_goal}
+
+
+def changes_since(since, limit):
+    """ Up to `limit` changes with cursor > since, oldest first, and the cursor
+    to resume from. Reads at most `limit` rows per table and merges them. """
+    entries = []
+    for table, (model, key) in TRACKED.items():
+        rows = (model.query.filter(model.change_seq > since)
+                .order_by(model.change_seq).limit(limit + 1).all())
+        entries += [{
+            "seq": row.change_seq,
+            "entity": table,
+            "op": "upsert",
+            "key": key(row),
+            "updatedAt": row.updated_at.isoformat() if row.updated_at else None,
+            "data": _serialize(table, row),
+        } for row in rows]
+    tombstones = (Tombstone.query.filter(Tombstone.change_seq > since)
+                  .order_by(Tombstone.change_seq).limit(limit + 1).all())
+    entries += [{
+        "seq": t.change_seq,
+        "entity": t.entity,
+        "op": "reset" if t.entity == '*' else "delete",
+        "key": t.entity_key,
+        "updatedAt": t.deleted_at.isoformat(),
+    } for t in tombstones]
+    entries.sort(key=lambda e: e["seq"])
+    page = entries[:limit]
+    return {
+        "changes": page,
+        "cursor": page[-1]["seq"] if page else since,
+        "hasMore": len(entries) > limit,
+    }
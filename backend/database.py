@@ -1,6 +1,8 @@
 # backend/database.py
 import os
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from dotenv import load_dotenv
 
 # Load environment variables from .env file (primarily for DATABASE_URL)
@@ -9,10 +11,58 @@ load_dotenv()
 # Create the SQLAlchemy database instance
 db = SQLAlchemy()
 
+def sqlite_pragmas(in_memory=False):
+    """
+    Per-connection PRAGMAs for the embedded SQLite mode (DATABASE_URL=sqlite:///...).
+    Sizes can be tuned through SQLITE_MMAP_SIZE (bytes), SQLITE_CACHE_SIZE_KB and
+    SQLITE_BUSY_TIMEOUT_MS. WAL, synchronous and mmap only apply to file databases.
+    """
+    pragmas = [
+        # SQLite leaves FK enforcement off by default; Postgres always enforces.
+        ('foreign_keys', 'ON'),
+        # Wait for a competing writer (e.g. the session timer flush) instead of
+        # failing immediately with "database is locked".
+        ('busy_timeout', int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))),
+        ('temp_store', 'MEMORY'),
+        # Negative values are KiB rather than pages.
+        ('cache_size', -int(os.getenv('SQLITE_CACHE_SIZE_KB', 65536))),
+    ]
+    if not in_memory:
+        pragmas += [
+            # Readers don't block the writer and vice versa; with WAL, NORMAL only
+            # risks the last transactions on power loss, never corruption.
+            ('journal_mode', 'WAL'),
+            ('synchronous', 'NORMAL'),
+            # Read pages straight from the OS page cache instead of copying them.
+            ('mmap_size', int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))),
+        ]
+    return pragmas
+
+
+def _init_sqlite(app, url):
+    """ Embedded mode: creates the database file's directory and applies
+    sqlite_pragmas() to every new connection through the engine's connect event. """
+    in_memory = url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'
+    if not in_memory:
+        directory = os.path.dirname(os.path.abspath(url.database))
+        os.makedirs(directory, exist_ok=True)
+    pragmas = sqlite_pragmas(in_memory)
+
+    def apply_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', apply_pragmas)
+
+
 def init_app(app):
     """
     Initializes the database connection using the DATABASE_URL from environment variables.
-    Raises an error if the DATABASE_URL is not set.
+    Raises an error if the DATABASE_URL is not set. A sqlite:/// URL selects the
+    embedded single-process mode (see sqlite_pragmas()).
     """
     # Get the database connection string from environment variables
     db_url = os.getenv('DATABASE_URL')
@@ -29,6 +79,10 @@ def init_app(app):
     # Associate the SQLAlchemy instance with the Flask app
     db.init_app(app)
 
+    url = make_url(db_url)
+    if url.get_backend_name() == 'sqlite':
+        _init_sqlite(app, url)
+
     # Print host/db for confirmation while hiding any user/pass. Guard against
     # URLs without credentials (e.g. sqlite:///... used in tests) so this never
     # raises an IndexError at startup.
@@ -0,0 +1,199 @@
+# backend/jobs.py
+"""
+In-process background jobs for operations too slow for the request path
+(exports, snapshots, reset).
+
+POST /api/jobs/<kind> records a Job row and hands it to a bounded thread pool
+(JOB_WORKERS threads, default 2); at most JOB_MAX_PENDING jobs (default 20) may
+be queued or running at once, beyond that submissions get a 429. The worker
+reports progress through JobContext.progress(), which is also where a
+cancellation (POST /api/jobs/<id>/cancel) takes effect: a queued job never
+starts, a running one stops at its next progress call. Results are files under
+JOB_RESULT_DIR, served by GET /api/jobs/<id>/result and removed with the job
+JOB_RESULT_TTL seconds (default a day) after it finishes.
+
+Threads rather than processes: the work is database and file I/O, and workers
+share the app's engine. JOB_WORKERS=0 runs each job inline at submission
+(tests). Like the session timer, the pool lives in the process, so run the API
+as a single process; jobs still queued or running when it stops are marked
+failed at the next start.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from database import db
+from models import Job
+
+# Progress is written at most this often (seconds); the final state always is.
+PROGRESS_INTERVAL = 0.5
+ACTIVE = ('queued', 'running')
+
+
+class JobCancelled(Exception):
+    """ Raised inside a job when its cancellation was requested. """
+
+
+class JobQueueFull(Exception):
+    """ JOB_MAX_PENDING jobs are already queued or running. """
+
+
+class JobContext:
+    """ Handed to a job function: where to write its result, and how to report
+    progress (which doubles as the cancellation check). """
+
+    def __init__(self, runner, job, params):
+        self._runner = runner
+        self._job = job
+        self._last_write = 0.0
+        self.job_id = job.id
+        self.params = params
+        self.result_path = os.path.join(runner.result_dir, job.id)
+
+    def check_cancelled(self):
+        if self._runner._cancel_flags[self._job.id].is_set():
+            raise JobCancelled()
+
+    def progress(self, fraction):
+        self.check_cancelled()
+        now = time.monotonic()
+        if now - self._last_write >= PROGRESS_INTERVAL:
+            self._last_write = now
+            self._job.progress = min(max(fraction, 0.0), 1.0)
+            db.session.commit()
+
+
+class JobRunner:
+    """ Registry of job kinds plus the bounded pool that runs them. """
+
+    def __init__(self, app, workers=2, max_pending=20, result_dir=None, result_ttl=86400):
+        self.app = app
+        self.max_pending = max_pending
+        self.result_dir = result_dir or os.path.join(tempfile.gettempdir(), 'jobtracker-jobs')
+        self.result_ttl = result_ttl
+        self._kinds = {}
+        self._cancel_flags = {}  # job id -> threading.Event, for queued/running jobs
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job') if workers > 0 else None
+        os.makedirs(self.result_dir, exist_ok=True)
+
+    def kind(self, name, validate=None):
+        """ Decorator registering `fn(ctx)` as job kind `name`. `validate(params)`
+        returns the cleaned params or raises ValueError (a 400). The function
+        writes its result to ctx.result_path (if any) and returns
+        (download name, mimetype), or None when there is no file. """
+        def register(fn):
+            self._kinds[name] = (fn, validate)
+            return fn
+        return register
+
+    @property
+    def kinds(self):
+        return sorted(self._kinds)
+
+    def submit(self, kind, params):
+        """ Records and queues a job; returns the Job. Raises KeyError for an
+        unknown kind, ValueError for bad params, JobQueueFull when saturated. """
+        fn, validate = self._kinds[kind]
+        params = validate(params) if validate else {}
+        self._prune()
+        with self._lock:
+            if len(self._cancel_flags) >= self.max_pending:
+                raise JobQueueFull()
+            job = Job(id=uuid.uuid4().hex, kind=kind, params=json.dumps(params))
+            db.session.add(job)
+            db.session.commit()
+            self._cancel_flags[job.id] = threading.Event()
+            if self._executor is not None:
+                self._futures[job.id] = self._executor.submit(self._run, job.id)
+        if self._executor is None:
+            self._run(job.id)
+            db.session.refresh(job)
+        return job
+
+    def cancel(self, job):
+        """ Requests cancellation; a job that hasn't started is cancelled at once. """
+        if job.status not in ACTIVE:
+            return job
+        job.cancel_requested = True
+        with self._lock:
+            flag = self._cancel_flags.get(job.id)
+            if flag is not None:
+                flag.set()
+            future = self._futures.get(job.id)
+            if future is not None and future.cancel():
+                self._forget(job.id)
+                job.status = 'cancelled'
+                job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return job
+
+    def recover(self):
+        """ Marks jobs left queued/running by a previous process as failed. """
+        Job.query.filter(Job.status.in_(ACTIVE)).update(
+            {"status": 'failed', "error": "Interrupted by a server restart.", "finished_at": datetime.utcnow()},
+            synchronize_session=False)
+        db.session.commit()
+
+    def _forget(self, job_id):
+        self._cancel_flags.pop(job_id, None)
+        self._futures.pop(job_id, None)
+
+    def _prune(self):
+        """ Deletes finished jobs (and their files) older than result_ttl. """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.result_ttl)
+        old = Job.query.filter(Job.status.notin_(ACTIVE), Job.finished_at < cutoff).all()
+        for job in old:
+            if job.result_path and os.path.exists(job.result_path):
+                os.remove(job.result_path)
+            db.session.delete(job)
+        if old:
+            db.session.commit()
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            job = db.session.get(Job, job_id)
+            fn, _validate = self._kinds[job.kind]
+            ctx = JobContext(self, job, json.loads(job.params or '{}'))
+            try:
+                ctx.check_cancelled()
+                job.status, job.started_at = 'running', datetime.utcnow()
+                db.session.commit()
+                result = fn(ctx)
+                if result:
+                    job.result_path = ctx.result_path
+                    job.result_name, job.result_type = result
+                job.status, job.progress = 'succeeded', 1.0
+            except JobCancelled:
+                db.session.rollback()
+                job.status = 'cancelled'
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.error(f"Job {job_id} ({job.kind}) failed: {e}")
+                job.status, job.error = 'failed', str(e)
+            finally:
+                if job.status != 'succeeded' and os.path.exists(ctx.result_path):
+                    os.remove(ctx.result_path)
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                with self._lock:
+                    self._forget(job_id)
+
+
+def init_jobs(app):
+    """ Creates the app's job runner from the JOB_* environment variables. """
+    runner = JobRunner(
+        app,
+        workers=int(os.getenv('JOB_WORKERS', 2)),
+        max_pending=int(os.getenv('JOB_MAX_PENDING', 20)),
+        result_dir=os.getenv('JOB_RESULT_DIR') or None,
+        result_ttl=int(os.getenv('JOB_RESULT_TTL', 86400)),
+    )
+    app.extensions['jobs'] = runner
+    return runner
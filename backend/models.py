@@ -1,10 +1,23 @@
 # backend/models.py
+import hashlib
+import json
+import re
+
 from database import db
 from datetime import date, timedelta, datetime # Added datetime
-from sqlalchemy import desc, ForeignKey # Added ForeignKey
+from sqlalchemy import desc, ForeignKey, DDL, event # Added ForeignKey
 from sqlalchemy.orm import relationship # Added relationship
 
 
+# --- Change tracking columns ------------------------------------------------
+# Every synced table carries the cursor value of its last change and when it
+# happened; changes.py stamps both on each write and serves GET /api/changes.
+# Additive columns: they only materialize on a fresh DB (no migration tooling).
+class ChangeTracked:
+    change_seq = db.Column(db.BigInteger, nullable=True, index=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
+
+
 # --- Shared timezone helper -------------------------------------------------
 # "Today" is always evaluated in US Eastern Time so streak logic is independent
 # of the container's local clock. Both app.py and the streak math below rely on
@@ -20,7 +33,7 @@ def get_eastern_today():
     return datetime.now(eastern).date()
 
 
-class Setting(db.Model):
+class Setting(ChangeTracked, db.Model):
     """ Model to store application settings (unchanged). """
     __tablename__ = 'settings'
     id = db.Column(db.Integer, primary_key=True)
@@ -30,7 +43,7 @@ class Setting(db.Model):
     def __repr__(self):
         return f'<Setting {self.key} Goal: {self.daily_goal}>'
 
-class DailyLog(db.Model):
+class DailyLog(ChangeTracked, db.Model):
     """ Model to store summary for each day logging was finished. """
     __tablename__ = 'daily_logs'
     log_date = db.Column(db.Date, primary_key=True)
@@ -41,11 +54,20 @@ class DailyLog(db.Model):
     # materialize since there is no migration tooling). Nullable so existing rows
     # remain valid.
     notes = db.Column(db.Text, nullable=True)
+    # Hash of the day's stored content (summary fields + applications), used to
+    # short-circuit byte-identical re-submissions. NULL means "unknown", so rows
+    # written before this column existed simply get rewritten once.
+    content_hash = db.Column(db.String(64), nullable=True)
+    # Optimistic-concurrency version. Mapped as the SQLAlchemy version_id_col, so
+    # every UPDATE is guarded by "WHERE version = <loaded>" and bumps it by one.
+    version = db.Column(db.Integer, nullable=False, default=1)
 
     # Relationship to ApplicationLog (one-to-many)
     # cascade="all, delete-orphan": ensures applications are deleted if the DailyLog is deleted.
     applications = relationship("ApplicationLog", back_populates="daily_log", cascade="all, delete-orphan")
 
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         return f'<DailyLog Date: {self.log_date} Status: {self.status} Count: {self.completed_count}>'
 
@@ -56,10 +78,31 @@ class DailyLog(db.Model):
             "completedCount": self.completed_count,
             "elapsedSeconds": self.elapsed_seconds,
             "notes": self.notes,
+            "version": self.version,
         }
 
+def application_fingerprint(company, job_name):
+    """ Normalized identity of "this role at this company": case-folded, with
+    punctuation and repeated whitespace collapsed, then SHA-1'd to a fixed-width
+    index key. None unless both parts are present, so half-filled rows never
+    match each other. """
+    def norm(value):
+        return ' '.join(re.sub(r'[^\w\s]', ' ', (value or '').casefold()).split())
+    company, job_name = norm(company), norm(job_name)
+    if not company or not job_name:
+        return None
+    return hashlib.sha1(f"{company}\x1f{job_name}".encode('utf-8')).hexdigest()
+
+
+def _fingerprint_default(context):
+    # Context-sensitive column default: fills the fingerprint on every INSERT
+    # path (ORM add, executemany bulk insert) from the row being inserted.
+    params = context.get_current_parameters()
+    return application_fingerprint(params.get('company'), params.get('job_name'))
+
+
 # --- NEW Model: ApplicationLog ---
-class ApplicationLog(db.Model):
+class ApplicationLog(ChangeTracked, db.Model):
     """ Model to store individual application details for a specific log date. """
     __tablename__ = 'application_logs'
     id = db.Column(db.Integer, primary_key=True)
@@ -70,6 +113,20 @@ class ApplicationLog(db.Model):
     resume_used = db.Column(db.String(200), nullable=True)
     # Add a timestamp for potential future ordering within a day
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    # See application_fingerprint(). Rows are replaced rather than edited in
+    # place, so an insert-time default keeps it in sync. Additive column: only
+    # materializes on a fresh DB (no migration tooling).
+    fingerprint = db.Column(db.String(40), nullable=True, default=_fingerprint_default)
+
+    # Duplicate checks probe (fingerprint, log_date < day): one index range scan
+    # per fingerprint regardless of history size.
+    # A day's applications are read in (log_date, timestamp) order and deleted
+    # and joined by log_date; the same index also serves the foreign-key check
+    # when a day is deleted. Additive indexes: only materialize on a fresh DB.
+    __table_args__ = (
+        db.Index('ix_application_logs_fingerprint_log_date', 'fingerprint', 'log_date'),
+        db.Index('ix_application_logs_log_date_timestamp', 'log_date', 'timestamp'),
+    )
 
     # Relationship back to DailyLog (many-to-one)
     daily_log = relationship("DailyLog", back_populates="applications")
@@ -90,7 +147,7 @@ class ApplicationLog(db.Model):
 
 
 # --- NEW Model: GoalHistory ---
-class GoalHistory(db.Model):
+class GoalHistory(ChangeTracked, db.Model):
     """ Records every change to the daily goal so progress can be judged against
     the goal that was actually in effect over time. Additive table; only
     materializes on a fresh DB (no migration tooling in this project). """
@@ -106,6 +163,68 @@ class GoalHistory(db.Model):
         }
 
 
+# --- Change feed bookkeeping (see changes.py) ---
+class ChangeCounter(db.Model):
+    """ Single row holding the last cursor value handed out. Writers advance it
+    with one UPDATE ... RETURNING, which row-locks it until commit, so cursor
+    values become visible in the order they were assigned. """
+    __tablename__ = 'change_counter'
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+# Seed the counter row whenever the table is created (also on drop_all/create_all).
+event.listen(ChangeCounter.__table__, 'after_create',
+             DDL("INSERT INTO change_counter (id, value) VALUES (1, 0)"))
+
+
+class Tombstone(db.Model):
+    """ A deleted row, kept so sync clients can find out about the delete.
+    `entity` is the table name and `entity_key` its key as text; entity '*'
+    records a full reset. """
+    __tablename__ = 'tombstones'
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(30), nullable=False)
+    entity_key = db.Column(db.String(64), nullable=False)
+    change_seq = db.Column(db.BigInteger, nullable=False, index=True)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+# --- Background jobs (see jobs.py) ---
+class Job(db.Model):
+    """ One run of a background job: its state, progress and result file.
+    Additive table; only materializes on a fresh DB (no migration tooling). """
+    __tablename__ = 'jobs'
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(40), nullable=False)
+    params = db.Column(db.Text, nullable=True)  # JSON
+    # 'queued' -> 'running' -> 'succeeded' | 'failed' | 'cancelled'
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    progress = db.Column(db.Float, nullable=False, default=0.0)  # 0.0 - 1.0
+    error = db.Column(db.Text, nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    result_path = db.Column(db.String(500), nullable=True)
+    result_name = db.Column(db.String(200), nullable=True)
+    result_type = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "error": self.error,
+            "cancelRequested": self.cancel_requested,
+            "resultUrl": f"/api/jobs/{self.id}/result" if self.status == 'succeeded' and self.result_path else None,
+            "createdAt": self.created_at.isoformat() if self.created_at else None,
+            "startedAt": self.started_at.isoformat() if self.started_at else None,
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
 # --- Helper Functions ---
 
 def get_settings():
@@ -119,140 +238,29 @@ def get_settings():
     return settings
 
 
-def _milestone_for(streak):
-    """ Returns the most recent milestone reached for a streak length, or None. """
-    milestones = [365, 180, 100, 50, 30, 14, 7, 3]
-    for m in milestones:
-        if streak >= m:
-            return m
-    return None
-
-
-def get_current_status():
-    """ Calculates streaks, total days, last log date/status (fixed logic, always uses US Eastern Time for today). """
-    today = get_eastern_today()
-    logs = DailyLog.query.order_by(DailyLog.log_date).all()  # ASC order
-    log_map = {log.log_date: log.status for log in logs}
-    if not logs:
-        return {
-            "totalStreak": 0,
-            "goalStreak": 0,
-            "totalDaysLogged": 0,
-            "lastCompletedDate": None,
-            "lastLogStatus": None,
-            "currentMilestone": None,
-            "nextMilestone": 3,
-        }
-    last_log = logs[-1]
-    last_log_date = last_log.log_date
-    last_log_status = last_log.status
-    total_days = len(logs)
-    # --- Calculate goal streak ---
-    goal_streak = 0
-    streak_date = today
-    while True:
-        status = log_map.get(streak_date)
-        if status != 'complete':
-            break
-        goal_streak += 1
-        streak_date -= timedelta(days=1)
-    # --- Calculate total streak ---
-    total_streak = 0
-    streak_date = today
-    while True:
-        status = log_map.get(streak_date)
-        if status is None:
-            break
-        total_streak += 1
-        streak_date -= timedelta(days=1)
-    last_completed_iso = last_log_date.isoformat() if last_log_date else None
-
-    # --- Milestones (badge-style, borrowed from habit trackers) ---
-    current_milestone = _milestone_for(goal_streak)
-    milestone_ladder = [3, 7, 14, 30, 50, 100, 180, 365]
-    next_milestone = next((m for m in milestone_ladder if m > goal_streak), None)
-
-    return {
-        "totalStreak": total_streak,
-        "goalStreak": goal_streak,
-        "totalDaysLogged": total_days,
-        "lastCompletedDate": last_completed_iso,
-        "lastLogStatus": last_log_status,
-        "currentMilestone": current_milestone,
-        "nextMilestone": next_milestone,
-    }
-
-
-def get_analytics():
-    """ Aggregate analytics across all logged days. No schema dependency beyond
-    the existing tables. Returns camelCase keys for the frontend. """
-    logs = DailyLog.query.order_by(DailyLog.log_date).all()
-    total_days = len(logs)
-    if total_days == 0:
-        return {
-            "totalDaysLogged": 0,
-            "totalApplications": 0,
-            "totalCompleteDays": 0,
-            "completionRate": 0,
-            "avgApplicationsPerDay": 0,
-            "avgMinutesPerDay": 0,
-            "totalMinutes": 0,
-            "bestDay": None,
-            "longestGoalStreak": 0,
-            "byWeekday": [],
-        }
-
-    total_apps = sum(l.completed_count for l in logs)
-    total_complete = sum(1 for l in logs if l.status == 'complete')
-    total_seconds = sum(l.elapsed_seconds for l in logs)
-
-    # Best (most productive) day
-    best = max(logs, key=lambda l: l.completed_count)
-    best_day = {
-        "date": best.log_date.isoformat(),
-        "completedCount": best.completed_count,
-    } if best.completed_count > 0 else None
-
-    # Longest goal streak ever (not just current). Walk all complete days.
-    complete_dates = sorted(l.log_date for l in logs if l.status == 'complete')
-    longest = 0
-    run = 0
-    prev = None
-    for d in complete_dates:
-        if prev is not None and (d - prev) == timedelta(days=1):
-            run += 1
-        else:
-            run = 1
-        longest = max(longest, run)
-        prev = d
-
-    # Per-weekday breakdown (Mon=0 ... Sun=6)
-    weekday_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    weekday_apps = [0] * 7
-    weekday_days = [0] * 7
-    for l in logs:
-        wd = l.log_date.weekday()
-        weekday_apps[wd] += l.completed_count
-        weekday_days[wd] += 1
-    by_weekday = [
-        {
-            "weekday": weekday_names[i],
-            "totalApplications": weekday_apps[i],
-            "daysLogged": weekday_days[i],
-            "avgApplications": round(weekday_apps[i] / weekday_days[i], 2) if weekday_days[i] else 0,
-        }
-        for i in range(7)
-    ]
-
-    return {
-        "totalDaysLogged": total_days,
-        "totalApplications": total_apps,
-        "totalCompleteDays": total_complete,
-        "completionRate": round(total_complete / total_days * 100, 1),
-        "avgApplicationsPerDay": round(total_apps / total_days, 2),
-        "avgMinutesPerDay": round((total_seconds / total_days) / 60, 1),
-        "totalMinutes": round(total_seconds / 60, 1),
-        "bestDay": best_day,
-        "longestGoalStreak": longest,
-        "byWeekday": by_weekday,
-    }
+def compute_day_hash(status, completed_count, elapsed_seconds, notes, applications):
+    """ SHA-256 over a canonical encoding of everything a day write stores.
+    `applications` is a sequence of (job_name, company, resume_used) tuples in
+    stored order, with empty strings already normalized to None. """
+    canonical = json.dumps(
+        [status, completed_count, elapsed_seconds, notes,
+         [list(a) for a in applications]],
+        separators=(',', ':'), ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def find_previous_applications(fingerprints, before):
+    """ Maps each fingerprint to the dates (newest first) it was logged on
+    strictly before `before`. One indexed query for the whole batch. """
+    wanted = {fp for fp in fingerprints if fp}
+    found = {fp: [] for fp in wanted}
+    if not wanted:
+        return found
+    rows = db.session.query(ApplicationLog.fingerprint, ApplicationLog.log_date).filter(
+        ApplicationLog.fingerprint.in_(wanted),
+        ApplicationLog.log_date < before,
+    ).distinct().order_by(ApplicationLog.log_date.desc())
+    for fp, log_date in rows:
+        found[fp].append(log_date.isoformat())
+    return found
@@ -0,0 +1,206 @@
+# backend/profiling.py
+"""
+Opt-in, per-request profiling for chasing endpoints that are only slow in
+production (e.g. /api/analytics on a big dataset) where attaching a profiler to
+the `flask run` process isn't an option.
+
+Enabled only when PROFILE_DIR is set (app.config or environment). When it is
+not, init_profiling() registers nothing, so normal requests pay zero cost.
+
+When enabled, a request is profiled with cProfile if either
+  - it carries the shared secret: header `X-Profile-Token: <PROFILE_TOKEN>` or
+    query param `?profile_token=<PROFILE_TOKEN>`, or
+  - it is picked by random sampling at PROFILE_SAMPLE_RATE (0.0-1.0, default 0).
+Each profile writes three artifacts to PROFILE_DIR sharing one stem:
+  <stem>.prof       pstats dump (python -m pstats / snakeviz)
+  <stem>.collapsed  collapsed stacks in microseconds (flamegraph.pl, speedscope)
+  <stem>.json       request metadata (method, path, status, duration)
+and only the newest PROFILE_KEEP (default 200) profiles are retained.
+
+GET /api/debug/profiles lists them and GET /api/debug/profiles/<file> downloads
+one; both require the token, and are 403 if no PROFILE_TOKEN is configured.
+"""
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+from flask import g, request, jsonify, send_from_directory
+
+ARTIFACT_SUFFIXES = ('.prof', '.collapsed', '.json')
+_MAX_STACK_DEPTH = 128
+
+
+def _config(app, key, default=None):
+    value = app.config.get(key)
+    return value if value is not None else os.getenv(key, default)
+
+
+def init_profiling(app):
+    """ Registers the profiling hooks and debug routes if PROFILE_DIR is set. """
+    profile_dir = _config(app, 'PROFILE_DIR')
+    if not profile_dir:
+        return
+    profile_dir = os.path.abspath(profile_dir)
+    os.makedirs(profile_dir, exist_ok=True)
+    token = _config(app, 'PROFILE_TOKEN')
+    sample_rate = float(_config(app, 'PROFILE_SAMPLE_RATE', 0) or 0)
+    keep = int(_config(app, 'PROFILE_KEEP', 200))
+    # cProfile can't run two profilers at once (and on 3.12+ refuses to), so
+    # concurrent requests simply go unprofiled while one is being captured.
+    active = threading.Lock()
+
+    def has_token():
+        supplied = request.headers.get('X-Profile-Token') or request.args.get('profile_token')
+        return bool(token and supplied and hmac.compare_digest(supplied, token))
+
+    @app.before_request
+    def _start_profile():
+        if request.path.startswith('/api/debug/profiles'):
+            return
+        if not (has_token() or (sample_rate and random.random() < sample_rate)):
+            return
+        if not active.acquire(blocking=False):
+            return
+        g._profiler = cProfile.Profile()
+        g._profile_started = time.perf_counter()
+        g._profiler.enable()
+
+    @app.after_request
+    def _record_status(response):
+        if '_profiler' in g:
+            g._profile_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _stop_profile(exc):
+        profiler = g.pop('_profiler', None)
+        if profiler is None:
+            return
+        try:
+            profiler.disable()
+            duration_ms = (time.perf_counter() - g._profile_started) * 1000
+            _write_artifacts(profile_dir, profiler, {
+                "method": request.method,
+                "path": request.full_path.rstrip('?'),
+                "endpoint": request.endpoint,
+                "status": g.pop('_profile_status', 500 if exc else None),
+                "durationMs": round(duration_ms, 2),
+            })
+            _prune(profile_dir, keep)
+        except Exception as e:
+            app.logger.error(f"Failed to write request profile: {e}")
+        finally:
+            active.release()
+
+    @app.route('/api/debug/profiles', methods=['GET'])
+    def list_profiles():
+        """ Lists captured profiles, newest first. """
+        if not has_token():
+            return jsonify({"error": "Profiling token required"}), 403
+        profiles = []
+        for name in sorted(os.listdir(profile_dir), reverse=True):
+            if not name.endswith('.json'):
+                continue
+            stem = name[:-len('.json')]
+            try:
+                with open(os.path.join(profile_dir, name), encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            meta["id"] = stem
+            meta["files"] = [stem + s for s in ARTIFACT_SUFFIXES
+                             if os.path.exists(os.path.join(profile_dir, stem + s))]
+            profiles.append(meta)
+        return jsonify({"profiles": profiles}), 200
+
+    @app.route('/api/debug/profiles/<path:filename>', methods=['GET'])
+    def download_profile(filename):
+        """ Downloads one artifact (send_from_directory rejects path traversal). """
+        if not has_token():
+            return jsonify({"error": "Profiling token required"}), 403
+        if not filename.endswith(ARTIFACT_SUFFIXES):
+            return jsonify({"error": "Unknown profile artifact"}), 404
+        return send_from_directory(profile_dir, filename, as_attachment=True)
+
+    app.logger.info(f"Request profiling enabled, writing to {profile_dir} "
+                    f"(sample rate {sample_rate}, token {'set' if token else 'not set'})")
+
+
+def _write_artifacts(profile_dir, profiler, meta):
+    now = datetime.now(timezone.utc)
+    endpoint = re.sub(r'[^A-Za-z0-9_]+', '_', meta["endpoint"] or 'unknown')
+    # Timestamp first so lexical order == chronological order.
+    stem = f"{now.strftime('%Y%m%dT%H%M%S%fZ')}-{endpoint}-{uuid.uuid4().hex[:6]}"
+    base = os.path.join(profile_dir, stem)
+    profiler.dump_stats(base + '.prof')
+    with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+        for stack, micros in collapsed_stacks(profiler).items():
+            f.write(f"{stack} {micros}\n")
+    meta["createdAt"] = now.isoformat()
+    with open(base + '.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+
+def _prune(profile_dir, keep):
+    stems = sorted({n.rsplit('.', 1)[0] for n in os.listdir(profile_dir) if n.endswith(ARTIFACT_SUFFIXES)})
+    for stem in stems[:max(0, len(stems) - keep)]:
+        for suffix in ARTIFACT_SUFFIXES:
+            try:
+                os.remove(os.path.join(profile_dir, stem + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def _frame_label(func):
+    filename, lineno, name = func
+    if filename == '~':  # builtins, e.g. "<method 'execute' of 'sqlite3.Cursor' objects>"
+        label = name
+    else:
+        label = f"{name} ({os.path.basename(filename)}:{lineno})"
+    return label.replace(';', ':')
+
+
+def collapsed_stacks(profiler):
+    """ Approximates collapsed stacks ("a;b;c <microseconds>") from cProfile's
+    caller/callee graph: each function's self time is split across the call
+    paths that reach it in proportion to the inclusive time on each edge.
+    cProfile only keeps one level of callers, so this is exact for tree-shaped
+    call graphs and a fair estimate for shared helpers. """
+    stats = pstats.Stats(profiler).stats  # {func: (cc, nc, tt, ct, callers)}
+    children = defaultdict(list)
+    for func, (_cc, _nc, _tt, _ct, callers) in stats.items():
+        for caller, edge in callers.items():
+            children[caller].append((func, edge[3]))
+    total = sum(v[2] for v in stats.values())
+    # Paths carrying less than this much time are dropped, which also bounds the
+    # walk on diamond-shaped graphs.
+    min_share = max(total * 1e-4, 1e-6)
+    out = Counter()
+
+    def walk(func, labels, seen, share):
+        _cc, _nc, tt, ct, _callers = stats[func]
+        ratio = min(1.0, share / ct) if ct else 0.0
+        self_us = int(tt * ratio * 1e6)
+        if self_us:
+            out[';'.join(labels)] += self_us
+        if len(labels) >= _MAX_STACK_DEPTH:
+            return
+        for child, edge_ct in children.get(func, ()):
+            child_share = edge_ct * ratio
+            if child in seen or child not in stats or child_share < min_share:
+                continue
+            walk(child, labels + [_frame_label(child)], seen | {child}, child_share)
+
+    roots = [f for f, v in stats.items() if not any(c in stats for c in v[4])]
+    for root in roots:
+        walk(root, [_frame_label(root)], {root}, stats[root][3])
+    return out
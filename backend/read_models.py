@@ -0,0 +1,255 @@
+# backend/read_models.py
+"""
+Read path for the hot read endpoints (state, calendar, day logs, analytics,
+export, debug_streaks).
+
+These only ever need a few columns, so instead of loading full ORM entities
+(identity map, change tracking, lazy relationships) and calling to_dict() on
+each, they issue Core select()s against the tables for just those columns and
+build the JSON straight from the result tuples. Responses are identical to the
+entity-based versions. Writes still go through the ORM models.
+"""
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from database import db
+from models import DailyLog, ApplicationLog, ChangeCounter, get_eastern_today
+
+_days = DailyLog.__table__
+_apps = ApplicationLog.__table__
+_counter = ChangeCounter.__table__
+
+
+class DayHeader:
+    """ Summary columns of one day, for responses that carry its ETag. """
+    __slots__ = ('status', 'notes', 'version')
+
+    def __init__(self, status, notes, version):
+        self.status = status
+        self.notes = notes
+        self.version = version
+
+
+def application_dict(app_id, job_name, company, resume_used):
+    """ Same shape as ApplicationLog.to_dict(). """
+    return {"id": app_id, "jobName": job_name, "company": company, "resume": resume_used, "done": True}
+
+
+def day_statuses():
+    """ [(log_date, status, version, cursor)] for every logged day, oldest
+    first. `cursor` is the change-feed counter (see changes.py), the same on
+    every row; it rides along so data_version() costs no extra statement. """
+    cursor = select(_counter.c.value).scalar_subquery()  # a single-row table
+    return db.session.execute(
+        select(_days.c.log_date, _days.c.status, _days.c.version, cursor).order_by(_days.c.log_date)
+    ).all()
+
+
+def data_version(logs):
+    """ Opaque token that changes whenever any row is written or deleted. It is
+    the change-feed cursor, read in the same statement as the days, so unlike
+    the row versions it never comes back after a delete and recreate, a reset
+    or a restore. Clients key their caches on it. """
+    return str(logs[0][3]) if logs else "0"
+
+
+def calendar_days(start, end):
+    """ Calendar entries for the days in [start, end). """
+    rows = db.session.execute(
+        select(_days.c.log_date, _days.c.status, _days.c.completed_count)
+        .where(_days.c.log_date >= start, _days.c.log_date < end)
+        .order_by(_days.c.log_date)
+    )
+    return [{"date": d.isoformat(), "status": status, "completedCount": count} for d, status, count in rows]
+
+
+def day_with_applications(log_date):
+    """ (DayHeader or None, [application dicts by timestamp]) in one statement:
+    the day's row LEFT JOINed to its applications. """
+    rows = db.session.execute(
+        select(_days.c.status, _days.c.notes, _days.c.version,
+               _apps.c.id, _apps.c.job_name, _apps.c.company, _apps.c.resume_used)
+        .select_from(_days.outerjoin(_apps, _apps.c.log_date == _days.c.log_date))
+        .where(_days.c.log_date == log_date)
+        .order_by(_apps.c.timestamp, _apps.c.id)
+    ).all()
+    if not rows:
+        return None, []
+    status, notes, version = rows[0][:3]
+    applications = [application_dict(*row[3:]) for row in rows if row[3] is not None]
+    return DayHeader(status, notes, version), applications
+
+
+def export_days():
+    """ Every day with its applications, oldest first, in the export_logs shape.
+    Two statements (days, then all applications) however long the history. """
+    applications = {}
+    for log_date, *app_row in db.session.execute(
+        select(_apps.c.log_date, _apps.c.id, _apps.c.job_name, _apps.c.company, _apps.c.resume_used)
+        .order_by(_apps.c.log_date, _apps.c.id)
+    ):
+        applications.setdefault(log_date, []).append(application_dict(*app_row))
+    days = db.session.execute(
+        select(_days.c.log_date, _days.c.status, _days.c.completed_count, _days.c.elapsed_seconds, _days.c.notes)
+        .order_by(_days.c.log_date)
+    )
+    return [
+        {
+            'log_date': log_date.isoformat(),
+            'status': status,
+            'completed_count': completed_count,
+            'elapsed_seconds': elapsed_seconds,
+            'notes': notes,
+            'applications': applications.get(log_date, []),
+        }
+        for log_date, status, completed_count, elapsed_seconds, notes in days
+    ]
+
+
+def _milestone_for(streak):
+    """ Returns the most recent milestone reached for a streak length, or None. """
+    milestones = [365, 180, 100, 50, 30, 14, 7, 3]
+    for m in milestones:
+        if streak >= m:
+            return m
+    return None
+
+
+def get_current_status(logs=None):
+    """ Calculates streaks, total days, last log date/status (fixed logic, always uses US Eastern Time for today).
+    `logs` may pass in day_statuses() when the caller already has them. """
+    today = get_eastern_today()
+    if logs is None:
+        logs = day_statuses()  # ASC order
+    log_map = {log_date: status for log_date, status, _version, _cursor in logs}
+    if not logs:
+        return {
+            "totalStreak": 0,
+            "goalStreak": 0,
+            "totalDaysLogged": 0,
+            "lastCompletedDate": None,
+            "lastLogStatus": None,
+            "currentMilestone": None,
+            "nextMilestone": 3,
+            "dataVersion": data_version(logs),
+        }
+    last_log_date, last_log_status, _version, _cursor = logs[-1]
+    total_days = len(logs)
+    # --- Calculate goal streak ---
+    goal_streak = 0
+    streak_date = today
+    while True:
+        status = log_map.get(streak_date)
+        if status != 'complete':
+            break
+        goal_streak += 1
+        streak_date -= timedelta(days=1)
+    # --- Calculate total streak ---
+    total_streak = 0
+    streak_date = today
+    while True:
+        status = log_map.get(streak_date)
+        if status is None:
+            break
+        total_streak += 1
+        streak_date -= timedelta(days=1)
+    last_completed_iso = last_log_date.isoformat() if last_log_date else None
+
+    # --- Milestones (badge-style, borrowed from habit trackers) ---
+    current_milestone = _milestone_for(goal_streak)
+    milestone_ladder = [3, 7, 14, 30, 50, 100, 180, 365]
+    next_milestone = next((m for m in milestone_ladder if m > goal_streak), None)
+
+    return {
+        "totalStreak": total_streak,
+        "goalStreak": goal_streak,
+        "totalDaysLogged": total_days,
+        "lastCompletedDate": last_completed_iso,
+        "lastLogStatus": last_log_status,
+        "currentMilestone": current_milestone,
+        "nextMilestone": next_milestone,
+        "dataVersion": data_version(logs),
+    }
+
+
+def get_analytics():
+    """ Aggregate analytics across all logged days. No schema dependency beyond
+    the existing tables. Returns camelCase keys for the frontend. """
+    logs = db.session.execute(
+        select(_days.c.log_date, _days.c.status, _days.c.completed_count, _days.c.elapsed_seconds)
+        .order_by(_days.c.log_date)
+    ).all()
+    total_days = len(logs)
+    if total_days == 0:
+        return {
+            "totalDaysLogged": 0,
+            "totalApplications": 0,
+            "totalCompleteDays": 0,
+            "completionRate": 0,
+            "avgApplicationsPerDay": 0,
+            "avgMinutesPerDay": 0,
+            "totalMinutes": 0,
+            "bestDay": None,
+            "longestGoalStreak": 0,
+            "byWeekday": [],
+        }
+
+    # Single pass over (log_date, status, completed_count, elapsed_seconds) tuples.
+    total_apps = 0
+    total_complete = 0
+    total_seconds = 0
+    best_date, best_count = None, None
+    longest = 0
+    run = 0
+    prev_complete = None
+    weekday_apps = [0] * 7
+    weekday_days = [0] * 7
+    for log_date, status, completed_count, elapsed_seconds in logs:
+        total_apps += completed_count
+        total_seconds += elapsed_seconds
+        # Best (most productive) day: first one wins ties, like max().
+        if best_count is None or completed_count > best_count:
+            best_date, best_count = log_date, completed_count
+        # Longest goal streak ever (not just current). Rows are in date order.
+        if status == 'complete':
+            total_complete += 1
+            if prev_complete is not None and (log_date - prev_complete) == timedelta(days=1):
+                run += 1
+            else:
+                run = 1
+            longest = max(longest, run)
+            prev_complete = log_date
+        # Per-weekday breakdown (Mon=0 ... Sun=6)
+        wd = log_date.weekday()
+        weekday_apps[wd] += completed_count
+        weekday_days[wd] += 1
+
+    best_day = {
+        "date": best_date.isoformat(),
+        "completedCount": best_count,
+    } if best_count > 0 else None
+
+    weekday_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    by_weekday = [
+        {
+            "weekday": weekday_names[i],
+            "totalApplications": weekday_apps[i],
+            "daysLogged": weekday_days[i],
+            "avgApplications": round(weekday_apps[i] / weekday_days[i], 2) if weekday_days[i] else 0,
+        }
+        for i in range(7)
+    ]
+
+    return {
+        "totalDaysLogged": total_days,
+        "totalApplications": total_apps,
+        "totalCompleteDays": total_complete,
+        "completionRate": round(total_complete / total_days * 100, 1),
+        "avgApplicationsPerDay": round(total_apps / total_days, 2),
+        "avgMinutesPerDay": round((total_seconds / total_days) / 60, 1),
+        "totalMinutes": round(total_seconds / 60, 1),
+        "bestDay": best_day,
+        "longestGoalStreak": longest,
+        "byWeekday": by_weekday,
+    }
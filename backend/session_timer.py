@@ -0,0 +1,197 @@
+# backend/session_timer.py
+"""
+Server-side timer for the active logging session.
+
+The page sends a heartbeat (POST /api/session/heartbeat) every few seconds and
+on pause/resume/close. Each heartbeat adds the wall time since the previous one
+to an in-memory per-day buffer, capped at SESSION_HEARTBEAT_GRACE seconds so a
+closed tab or a sleeping laptop stops accruing after one missed beat. Paused
+sessions don't accrue at all.
+
+Nothing is written per heartbeat. A daemon thread flushes every buffer that
+changed to DailyLog.elapsed_seconds once every SESSION_FLUSH_INTERVAL seconds
+(default 30; 0 disables the thread, e.g. in tests) in a single executemany
+UPDATE, and once more at interpreter exit. Days without a DailyLog row yet stay
+buffered until finish_day creates the row; the timer never creates days on its
+own, so an unfinished session doesn't show up in streaks or the calendar.
+
+The buffer lives in the process, so run the API as a single process (which
+`flask run` and the Docker image already do).
+"""
+import atexit
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import bindparam, event, select, update
+
+from changes import allocate
+from database import db
+from models import DailyLog
+
+
+_PENDING_KEY = 'session_timer_discards'
+
+
+class _Entry:
+    __slots__ = ('elapsed', 'paused', 'last_seen', 'dirty')
+
+    def __init__(self, elapsed, paused, now):
+        self.elapsed = elapsed
+        self.paused = paused
+        self.last_seen = now
+        self.dirty = True
+
+
+class SessionTimerBuffer:
+    """ Per-day elapsed-time accumulator with coalesced write-behind. """
+
+    def __init__(self, app, grace_seconds=60, clock=time.monotonic):
+        self.app = app
+        self.grace_seconds = grace_seconds
+        self._clock = clock
+        self._entries = {}
+        # Days (None: all) a transaction is about to overwrite; flush() skips them
+        # until it ends. See discard_on_commit().
+        self._held = Counter()
+        # Held across a flush's DB write too, so a finish/delete that calls
+        # discard_on_commit() first can't be overwritten by a flush already in progress.
+        self._lock = threading.Lock()
+
+    def heartbeat(self, log_date, paused, seed_seconds=0):
+        """ Records a heartbeat and returns (elapsed_seconds, paused). The first
+        beat of a day seeds the buffer from the stored log (or `seed_seconds`
+        from the client, whichever is larger). """
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(log_date)
+            if entry is None:
+                stored = db.session.get(DailyLog, log_date)
+                base = max(stored.elapsed_seconds if stored else 0, seed_seconds)
+                entry = self._entries[log_date] = _Entry(base, paused, now)
+                return entry.elapsed, entry.paused
+            if not entry.paused:
+                gained = int(min(max(now - entry.last_seen, 0), self.grace_seconds))
+                if gained:
+                    entry.elapsed += gained
+                    entry.dirty = True
+                    # Keep the fractional second for the next beat.
+                    now = entry.last_seen + gained if gained < self.grace_seconds else now
+            if entry.paused != paused:
+                entry.paused = paused
+                entry.dirty = True
+            entry.last_seen = now
+            return entry.elapsed, entry.paused
+
+    def peek(self, log_date):
+        """ (elapsed_seconds, paused) buffered for a day, or None. """
+        with self._lock:
+            entry = self._entries.get(log_date)
+            return (entry.elapsed, entry.paused) if entry else None
+
+    def discard(self, log_date=None):
+        """ Drops a day's buffer (all days if None) at once. """
+        with self._lock:
+            if log_date is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(log_date, None)
+
+    def discard_on_commit(self, log_date=None):
+        """ Call before a write in db.session that sets elapsed_seconds itself
+        (finish, edit, delete, reset). The day's buffer (all days if None) is
+        dropped only once that transaction commits, and kept if it rolls back;
+        until then flush() leaves the day alone, so it can't overwrite the
+        request's value. Needs the listeners init_session_timer() registers. """
+        with self._lock:
+            self._held[log_date] += 1
+        session = db.session()
+        if not session.in_transaction():
+            session.begin()  # so after_transaction_end releases the hold
+        session.info.setdefault(_PENDING_KEY, []).append(log_date)
+
+    def _committed(self, session):
+        for log_date in session.info.get(_PENDING_KEY, ()):
+            self.discard(log_date)
+
+    def _transaction_ended(self, session, transaction):
+        if transaction.parent is not None:
+            return
+        pending = session.info.pop(_PENDING_KEY, ())
+        if not pending:
+            return  # flush() commits while holding the lock
+        with self._lock:
+            for log_date in pending:
+                self._held[log_date] -= 1
+            self._held += Counter()  # drop zero counts
+
+    def flush(self):
+        """ Writes every changed buffer in one statement; returns how many. """
+        with self._lock:
+            if self._held[None]:
+                return 0
+            dirty = {d: e.elapsed for d, e in self._entries.items() if e.dirty and not self._held[d]}
+            if not dirty:
+                return 0
+            table = DailyLog.__table__
+            # Core UPDATE so the version isn't bumped: a timer tick shouldn't make
+            # an open editor's If-Match fail. The content hash no longer matches,
+            # so clear it.
+            stmt = (update(table)
+                    .where(table.c.log_date == bindparam('b_date'))
+                    .values(elapsed_seconds=bindparam('b_elapsed'), content_hash=None,
+                            change_seq=bindparam('b_seq'), updated_at=bindparam('b_now')))
+            with self.app.app_context():
+                try:
+                    # Only days that have a row are written; the others (unfinished
+                    # days) stay dirty until finish_day creates them.
+                    existing = db.session.execute(
+                        select(table.c.log_date).where(table.c.log_date.in_(list(dirty)))
+                    ).scalars().all()
+                    rows = [{"b_date": d, "b_elapsed": dirty[d]} for d in existing]
+                    if not rows:
+                        db.session.rollback()
+                        return 0
+                    # Timer writes show up in the change feed like any other edit.
+                    first = allocate(db.session.connection(), len(rows))
+                    now = datetime.utcnow()
+                    for offset, row in enumerate(rows):
+                        row.update(b_seq=first + offset, b_now=now)
+                    db.session.execute(stmt, rows)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.error(f"Error flushing session timers: {e}")
+                    return 0
+            for row in rows:
+                self._entries[row["b_date"]].dirty = False
+            # Past days can't receive heartbeats any more; forget them once saved
+            # (unsaved ones are still dirty and are kept).
+            latest = max(self._entries)
+            for d in [d for d, e in self._entries.items() if d != latest and not e.dirty]:
+                del self._entries[d]
+            return len(rows)
+
+
+def init_session_timer(app):
+    """ Creates the app's session timer buffer and starts its flush thread. """
+    interval = float(os.getenv('SESSION_FLUSH_INTERVAL', 30))
+    grace = float(os.getenv('SESSION_HEARTBEAT_GRACE', 60))
+    buffer = SessionTimerBuffer(app, grace_seconds=grace)
+    app.extensions['session_timer'] = buffer
+    event.listen(db.session, 'after_commit', buffer._committed)
+    event.listen(db.session, 'after_transaction_end', buffer._transaction_ended)
+    atexit.register(buffer.flush)
+
+    if interval > 0:
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                buffer.flush()
+
+        threading.Thread(target=run, name='session-timer-flush', daemon=True).start()
+        atexit.register(stop.set)
+    return buffer
@@ -0,0 +1,83 @@
+# backend/singleflight.py
+"""
+Request coalescing ("single flight") for the expensive whole-history reads:
+GET /api/state (streaks), GET /api/analytics and the exports.
+
+When several tabs or devices open at once they fire the same requests at the
+same moment. SingleFlight.do(key, fn) runs fn once per key at a time: callers
+that arrive while it is in flight wait for it and share its result (or its
+exception) instead of each scanning the tables. Nothing is kept once the call
+finishes, so this is not a cache; the next burst computes afresh.
+
+A caller must never be handed a result computed before a write it has already
+seen committed (e.g. its own finish_day). Keys therefore carry a generation
+number that every commit on db.session bumps: a request arriving after a commit
+starts a new flight instead of joining one that may have read the old rows.
+
+Results are shared between threads, so callers must treat them as read-only.
+Like the session timer, flights live in the process.
+"""
+import threading
+
+from sqlalchemy import event
+
+from database import db
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """ Coalesces concurrent calls that share a key and a data generation. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._generation = 0
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def invalidate(self):
+        """ Called after every commit: later callers start new flights. """
+        with self._lock:
+            self._generation += 1
+
+    def do(self, key, fn):
+        """ Returns fn(), running it only once for all concurrent callers of `key`. """
+        with self._lock:
+            flight = (key, self._generation)
+            call = self._calls.get(flight)
+            leader = call is None
+            if leader:
+                call = self._calls[flight] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[flight]
+            call.done.set()
+
+
+def init_singleflight(app):
+    """ Creates the app's SingleFlight and invalidates it on every commit. """
+    flights = SingleFlight()
+    event.listen(db.session, 'after_commit', lambda session: flights.invalidate())
+    app.extensions['singleflight'] = flights
+    return flights
@@ -0,0 +1,213 @@
+# backend/snapshot.py
+"""
+Compact binary snapshot of all user data (GET /api/snapshot) and atomic restore
+from one (POST /api/restore).
+
+File layout: the magic bytes b"JTSNAP", one format-version byte, then frames.
+Each frame is a 9-byte header (kind: u8, compressed length: u32, CRC32 of the
+uncompressed payload: u32, big-endian) followed by a zlib-compressed payload:
+
+    kind 0    header: JSON {"format", "createdAt", "tables": [[table, [columns]], ...]}
+    kind 1+i  rows of header table i: a compact JSON array of row arrays
+    kind 255  trailer: JSON {"rows": {table: count}}, so truncation is detected
+
+Dates are stored as ordinals and datetimes as ISO strings. Surrogate ids, the
+derived application fingerprint and the change-feed columns are left out; they
+are reassigned on restore (applications keep their order). Rows are read and
+written ROWS_PER_FRAME at a time, so neither side holds the whole history.
+"""
+import json
+import struct
+import zlib
+from datetime import date, datetime
+
+from sqlalchemy import insert, select
+
+from changes import record_reset, reserve, stamp_values
+from database import db
+from models import Setting, DailyLog, ApplicationLog, GoalHistory, application_fingerprint
+
+MAGIC = b'JTSNAP'
+FORMAT_VERSION = 1
+ROWS_PER_FRAME = 5000
+
+_FRAME = struct.Struct('>BII')
+_HEADER, _TRAILER = 0, 255
+
+# Restore order: parents before children (application_logs -> daily_logs FK).
+# Columns are listed explicitly so the file format doesn't drift with the models.
+SNAPSHOT_TABLES = [
+    (Setting.__table__, ['key', 'daily_goal'], 'id'),
+    (DailyLog.__table__, ['log_date', 'status', 'completed_count', 'elapsed_seconds',
+                          'notes', 'content_hash', 'version'], 'log_date'),
+    (GoalHistory.__table__, ['daily_goal', 'changed_at'], 'id'),
+    (ApplicationLog.__table__, ['log_date', 'job_name', 'company', 'resume_used', 'timestamp'], 'id'),
+]
+_TABLES = {table.name: (table, columns) for table, columns, _order in SNAPSHOT_TABLES}
+
+
+class SnapshotError(ValueError):
+    """ The uploaded file isn't a valid snapshot (bad magic, version, checksum,
+    unknown table/column, or truncated). """
+
+
+def _encoder(column):
+    if isinstance(column.type, db.DateTime):
+        return lambda v: v.isoformat() if v is not None else None
+    if isinstance(column.type, db.Date):
+        return lambda v: v.toordinal() if v is not None else None
+    return None
+
+
+def _decoder(column):
+    if isinstance(column.type, db.DateTime):
+        return lambda v: datetime.fromisoformat(v) if v is not None else None
+    if isinstance(column.type, db.Date):
+        return lambda v: date.fromordinal(v) if v is not None else None
+    return None
+
+
+def _frame(kind, payload):
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    data = zlib.compress(raw)
+    return _FRAME.pack(kind, len(data), zlib.crc32(raw)) + data
+
+
+def write_snapshot(connection):
+    """ Yields the snapshot of every table as bytes, one frame at a time. """
+    yield MAGIC + bytes([FORMAT_VERSION])
+    yield _frame(_HEADER, {
+        "format": FORMAT_VERSION,
+        "createdAt": datetime.utcnow().isoformat(),
+        "tables": [[table.name, columns] for table, columns, _order in SNAPSHOT_TABLES],
+    })
+    counts = {}
+    for index, (table, columns, order) in enumerate(SNAPSHOT_TABLES):
+        cols = [table.c[name] for name in columns]
+        encoders = [(i, enc) for i, enc in enumerate(map(_encoder, cols)) if enc]
+        counts[table.name] = 0
+        result = connection.execution_options(yield_per=ROWS_PER_FRAME).execute(
+            select(*cols).order_by(table.c[order]))
+        for rows in result.partitions():
+            payload = [list(row) for row in rows]
+            for row in payload:
+                for i, enc in encoders:
+                    row[i] = enc(row[i])
+            counts[table.name] += len(payload)
+            yield _frame(1 + index, payload)
+    yield _frame(_TRAILER, {"rows": counts})
+
+
+def stream_snapshot(engine):
+    """ write_snapshot() over its own connection, so the whole file sees one
+    consistent view of the four tables while it streams. """
+    connection = engine.connect()
+    try:
+        if connection.dialect.name == 'postgresql':
+            connection = connection.execution_options(isolation_level='REPEATABLE READ')
+        with connection.begin():
+            dbapi_connection = connection.connection.dbapi_connection
+            if connection.dialect.name == 'sqlite' and not dbapi_connection.in_transaction:
+                # pysqlite only emits BEGIN before DML, so each SELECT would
+                # otherwise read its own snapshot. With WAL the read snapshot
+                # holds from the first SELECT until the commit.
+                connection.exec_driver_sql('BEGIN')
+            yield from write_snapshot(connection)
+    finally:
+        connection.close()
+
+
+def _read_exact(stream, size):
+    chunks = []
+    while size:
+        chunk = stream.read(size)
+        if not chunk:
+            raise SnapshotError("Snapshot is truncated.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _read_frame(stream):
+    kind, length, checksum = _FRAME.unpack(_read_exact(stream, _FRAME.size))
+    try:
+        raw = zlib.decompress(_read_exact(stream, length))
+    except zlib.error:
+        raise SnapshotError("Snapshot frame is corrupt.")
+    if zlib.crc32(raw) != checksum:
+        raise SnapshotError("Snapshot checksum mismatch.")
+    try:
+        return kind, json.loads(raw)
+    except ValueError:
+        raise SnapshotError("Snapshot frame is corrupt.")
+
+
+def read_snapshot(stream):
+    """ Yields (table, [row dicts]) per frame from a binary stream, verifying
+    every checksum and, at the end, the trailer's row counts. """
+    if _read_exact(stream, len(MAGIC)) != MAGIC:
+        raise SnapshotError("Not a JobTracker snapshot.")
+    version = _read_exact(stream, 1)[0]
+    if version > FORMAT_VERSION:
+        raise SnapshotError(f"Snapshot format {version} is newer than this server supports.")
+    kind, header = _read_frame(stream)
+    if kind != _HEADER:
+        raise SnapshotError("Snapshot header is missing.")
+
+    layouts = []
+    try:
+        for name, columns in header["tables"]:
+            if name not in _TABLES or not set(columns) <= set(_TABLES[name][1]):
+                raise SnapshotError(f"Unknown table or column in snapshot: {name}.")
+            table = _TABLES[name][0]
+            layouts.append((table, columns, [_decoder(table.c[c]) for c in columns]))
+    except SnapshotError:
+        raise
+    except (KeyError, TypeError, ValueError):
+        raise SnapshotError("Snapshot header is invalid.")
+
+    counts = {table.name: 0 for table, _columns, _decoders in layouts}
+    while True:
+        kind, payload = _read_frame(stream)
+        if kind == _TRAILER:
+            if not isinstance(payload, dict) or payload.get("rows") != counts:
+                raise SnapshotError("Snapshot row counts don't match its trailer.")
+            return
+        if not 1 <= kind <= len(layouts):
+            raise SnapshotError("Unknown snapshot frame.")
+        table, columns, decoders = layouts[kind - 1]
+        try:
+            rows = [
+                {c: (dec(v) if dec else v) for c, dec, v in zip(columns, decoders, row)}
+                for row in payload
+            ]
+        except (TypeError, ValueError, OverflowError):
+            raise SnapshotError(f"Snapshot has an invalid value in {table.name}.")
+        counts[table.name] += len(rows)
+        yield table, rows
+
+
+def restore_snapshot(stream):
+    """ Replaces all data with the snapshot's, in the caller's transaction (the
+    caller commits, or rolls back on any error). Returns {table: rows restored}. """
+    db.session.query(ApplicationLog).delete()
+    db.session.query(DailyLog).delete()
+    db.session.query(GoalHistory).delete()
+    db.session.query(Setting).delete()
+    # Sync clients drop their copy and pull the restored rows from scratch.
+    record_reset()
+    restored = dict.fromkeys(_TABLES, 0)
+    fingerprints = {}
+    for table, rows in read_snapshot(stream):
+        if table is ApplicationLog.__table__:
+            # Set explicitly rather than via the column default: the same few
+            # (company, role) pairs repeat across years of rows.
+            for row in rows:
+                pair = (row.get('company'), row.get('job_name'))
+                if pair not in fingerprints:
+                    fingerprints[pair] = application_fingerprint(*pair)
+                row['fingerprint'] = fingerprints[pair]
+        if rows:
+            db.session.execute(insert(table), stamp_values(rows, reserve(len(rows))))
+        restored[table.name] += len(rows)
+    return restored
@@ -2,7 +2,40 @@
 pytest bootstrap. Ensures the backend tests run against an in-memory SQLite DB
 without needing Postgres or a .env file. This is import-time so it runs before
 the app module (which reads DATABASE_URL on import) is loaded.
+
+Also hosts the `client` fixture shared by the API test modules.
 """
 import os
+import sys
+import tempfile
 
 os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+# Tests flush the session timer buffer explicitly instead of from a thread.
+os.environ.setdefault('SESSION_FLUSH_INTERVAL', '0')
+# Background jobs run inline at submission, with results in a throwaway dir.
+os.environ.setdefault('JOB_WORKERS', '0')
+os.environ.setdefault('JOB_RESULT_DIR', tempfile.mkdtemp(prefix='jobtracker-jobs-'))
+
+# Make `backend/` importable when pytest is run from the repo root or backend/.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def client():
+    import app as app_module
+    from database import db
+    from models import get_settings
+
+    app_module.app.config['TESTING'] = True
+    app_module.session_timer.discard()
+    with app_module.app.app_context():
+        db.drop_all()
+        db.create_all()
+        # Re-seed default settings after the wipe.
+        get_settings()
+    with app_module.app.test_client() as c:
+        yield c
+    with app_module.app.app_context():
+        db.drop_all()
@@ -0,0 +1,33 @@
+"""
+Counts the SQL statements an engine executes, via SQLAlchemy's
+before_cursor_execute event. Used by the per-endpoint query budget tests to
+catch N+1 regressions that the functional tests can't see.
+
+    with QueryCounter(db.engine) as qc:
+        client.get('/api/export_logs')
+    assert qc.count <= 2, qc.statements
+"""
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """ Context manager recording every statement sent to the DB-API cursor. """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return False
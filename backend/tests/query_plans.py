@@ -0,0 +1,97 @@
+"""
+Captures the query plan of every statement an engine executes, for the
+query-plan regression tests (test_query_plans.py). Built on QueryCounter: each
+SELECT/UPDATE/DELETE is EXPLAINed on the same connection, inside the same
+transaction, just before it runs, with its real parameters (the first set of an
+executemany).
+
+    with QueryPlanRecorder(db.engine) as qp:
+        client.get('/api/logs/2024-01-01')
+    assert not qp.full_scans({'application_logs'}), qp.plans
+
+SQLite uses EXPLAIN QUERY PLAN. On Postgres (DATABASE_URL=postgresql://...)
+sequential scans are disabled while explaining, so a seq scan in the plan means
+no index can serve the query at all, not that the planner preferred one on a
+small table.
+"""
+import re
+
+from query_counter import QueryCounter
+
+_EXPLAINED = re.compile(r'^\s*(SELECT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+_FILTERED = re.compile(r'\bWHERE\b', re.IGNORECASE)
+_SQLITE_SCAN = re.compile(r'^SCAN (\w+)')
+
+
+class QueryPlanRecorder(QueryCounter):
+    """ QueryCounter that also records (statement, plan lines) for each query. """
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.plans = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        super()._before_cursor_execute(conn, cursor, statement, parameters, context, executemany)
+        if not _EXPLAINED.match(statement):
+            return
+        if executemany:
+            parameters = parameters[0]
+        self.plans.append((statement, self._explain(conn, statement, parameters)))
+
+    def _explain(self, conn, statement, parameters):
+        explain = conn.connection.dbapi_connection.cursor()
+        try:
+            if conn.dialect.name == 'postgresql':
+                explain.execute('SET enable_seqscan = off')
+                try:
+                    explain.execute(f'EXPLAIN (FORMAT JSON) {statement}', parameters)
+                    plan = explain.fetchone()[0]
+                finally:
+                    explain.execute('RESET enable_seqscan')
+                return list(_postgres_nodes(plan[0]['Plan']))
+            explain.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+            return [row[-1] for row in explain.fetchall()]
+        finally:
+            explain.close()
+
+    def full_scans(self, tables):
+        """ [(table, statement, plan)] for every filtered statement (one with a
+        WHERE clause) that reads the whole of one of `tables`. Unfiltered reads
+        of the whole history (analytics, export, streaks) scan by design. """
+        found = []
+        for statement, plan in self.plans:
+            if not _FILTERED.search(statement):
+                continue
+            for line in plan:
+                table = _scanned_table(line)
+                if table in tables:
+                    found.append((table, statement, plan))
+        return found
+
+
+def _postgres_nodes(node):
+    """ Flattens a JSON plan into 'Node Type on relation [Index Cond]' lines. """
+    line = node['Node Type']
+    if 'Relation Name' in node:
+        line += f" on {node['Relation Name']}"
+    if 'Index Name' in node:
+        line += f" using {node['Index Name']}"
+    if 'Index Cond' in node:
+        line += f" ({node['Index Cond']})"
+    yield line
+    for child in node.get('Plans', []):
+        yield from _postgres_nodes(child)
+
+
+def _scanned_table(line):
+    """ The table a plan line reads in full, or None. A SQLite SCAN walks every
+    row (even 'USING INDEX', which only supplies the order); on Postgres a seq
+    scan, or an index scan with no index condition, does. """
+    match = _SQLITE_SCAN.match(line)
+    if match:
+        return match.group(1)
+    match = re.match(r'^Seq Scan on (\w+)', line)
+    if match:
+        return match.group(1)
+    match = re.match(r'^Index (?:Only )?Scan on (\w+) using \w+$', line)
+    return match.group(1) if match else None
@@ -20,26 +20,9 @@ os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
 # Make `backend/` importable when pytest is run from the repo root or backend/.
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import pytest
-
-import app as app_module
-from database import db
 from models import DailyLog, get_eastern_today
 
-
-@pytest.fixture
-def client():
-    app_module.app.config['TESTING'] = True
-    with app_module.app.app_context():
-        db.drop_all()
-        db.create_all()
-        # Re-seed default settings after the wipe.
-        from models import get_settings
-        get_settings()
-    with app_module.app.test_client() as c:
-        yield c
-    with app_module.app.app_context():
-        db.drop_all()
+# The `client` fixture (fresh schema per test) lives in conftest.py.
 
 
 def _finish_today(client, count, apps=None, elapsed=60, notes=None):
@@ -179,3 +162,179 @@ def test_server_time_eastern(client):
     r = client.get('/api/server_time')
     assert r.status_code == 200
     assert r.get_json()['tz'] in ('EST', 'EDT')
+
+
+def test_finish_day_identical_resubmit_is_noop(client):
+    apps = [{'jobName': 'Eng', 'company': 'Acme', 'resume': 'v1'}]
+    first = _finish_today(client, 5, apps=apps, notes='n')
+    version = first.get_json()['version']
+    r = _finish_today(client, 5, apps=apps, notes='n')
+    assert r.status_code == 200
+    data = r.get_json()
+    assert 'unchanged' in data['message']
+    assert data['version'] == version
+    assert r.headers['ETag'] == f'"{version}"'
+    # Any change in content is a real write and bumps the version.
+    r2 = _finish_today(client, 5, apps=apps + [{'jobName': 'PM', 'company': 'B'}], notes='n')
+    assert 'updated' in r2.get_json()['message']
+    assert r2.get_json()['version'] == version + 1
+
+
+def test_finish_day_if_match_conflict(client):
+    today = get_eastern_today().isoformat()
+    _finish_today(client, 1)
+    etag = client.get(f'/api/session/{today}').headers['ETag']
+    payload = {'completedCount': 2, 'elapsedSeconds': 60, 'applications': []}
+    assert client.post('/api/finish_day', json=payload, headers={'If-Match': etag}).status_code == 200
+    # The stale ETag no longer matches the stored version.
+    stale = client.post('/api/finish_day', json={**payload, 'completedCount': 3}, headers={'If-Match': etag})
+    assert stale.status_code == 409
+    assert stale.get_json()['version'] == 2
+
+
+def test_edit_log_noop_and_if_match(client):
+    today = get_eastern_today().isoformat()
+    _finish_today(client, 2, notes='x')
+    r = client.put(f'/api/logs/{today}', json={'completedCount': 2, 'notes': 'x'})
+    assert r.get_json()['message'] == 'Log unchanged.'
+    assert r.get_json()['version'] == 1
+    assert client.put(f'/api/logs/{today}', json={'notes': 'y'},
+                      headers={'If-Match': '"7"'}).status_code == 409
+    ok = client.put(f'/api/logs/{today}', json={'notes': 'y'}, headers={'If-Match': '"1"'})
+    assert ok.status_code == 200
+    assert ok.get_json()['version'] == 2
+
+
+def test_finish_day_explicit_log_date(client):
+    # Writes queued offline carry the day they were recorded on.
+    yesterday = (get_eastern_today() - timedelta(days=1)).isoformat()
+    r = client.post('/api/finish_day', json={'completedCount': 5, 'elapsedSeconds': 1,
+                                             'applications': [], 'logDate': yesterday})
+    assert r.status_code == 200
+    assert client.get(f'/api/session/{yesterday}').get_json()['found'] is True
+    future = (get_eastern_today() + timedelta(days=1)).isoformat()
+    assert client.post('/api/finish_day', json={'completedCount': 1, 'elapsedSeconds': 1,
+                                                'applications': [], 'logDate': future}).status_code == 400
+    assert client.post('/api/finish_day', json={'completedCount': 1, 'elapsedSeconds': 1,
+                                                'applications': [], 'logDate': 'nope'}).status_code == 400
+
+
+def test_duplicate_application_lookup(client):
+    yesterday = (get_eastern_today() - timedelta(days=1)).isoformat()
+    client.post('/api/finish_day', json={'completedCount': 1, 'elapsedSeconds': 1, 'logDate': yesterday,
+                                         'applications': [{'jobName': 'Software Engineer', 'company': 'Acme, Inc.'}]})
+    # Normalization ignores case, punctuation and extra whitespace.
+    r = client.get('/api/applications/lookup?company=acme%20inc&jobName=software%20%20engineer')
+    assert r.status_code == 200
+    assert r.get_json()['duplicate'] is True
+    assert r.get_json()['previousDates'] == [yesterday]
+    # Only earlier days count.
+    r = client.get(f'/api/applications/lookup?company=Acme%20Inc&jobName=Software%20Engineer&before={yesterday}')
+    assert r.get_json()['duplicate'] is False
+    assert client.get('/api/applications/lookup?company=Acme').status_code == 400
+
+    batch = client.post('/api/applications/lookup', json={'applications': [
+        {'jobName': 'Software Engineer', 'company': 'ACME INC'}, 'junk', {'jobName': 'PM', 'company': 'Acme'}]})
+    results = batch.get_json()['results']
+    assert [(x['index'], x['duplicate']) for x in results] == [(0, True), (2, False)]
+
+
+def test_finish_day_annotates_duplicates(client):
+    yesterday = (get_eastern_today() - timedelta(days=1)).isoformat()
+    apps = [{'jobName': 'Eng', 'company': 'Acme'}]
+    client.post('/api/finish_day', json={'completedCount': 1, 'elapsedSeconds': 1, 'logDate': yesterday,
+                                         'applications': apps})
+    r = client.post('/api/finish_day', json={'completedCount': 2, 'elapsedSeconds': 1, 'annotateDuplicates': True,
+                                             'applications': [{'jobName': 'PM', 'company': 'B'}] + apps})
+    dups = r.get_json()['duplicates']
+    assert [(d['index'], d['previousDates']) for d in dups] == [(1, [yesterday])]
+    assert 'duplicates' not in _finish_today(client, 2, apps=apps).get_json()
+
+
+def test_day_logs_and_export_shapes(client):
+    today = get_eastern_today().isoformat()
+    # No row, then a row with no applications (the LEFT JOIN's all-NULL side).
+    assert client.get(f'/api/logs/{today}').get_json() == {
+        'log_date': today, 'status': None, 'notes': None, 'version': None, 'applications': []}
+    _finish_today(client, 0, notes='quiet day')
+    r = client.get(f'/api/logs/{today}')
+    assert r.get_json()['applications'] == [] and r.get_json()['notes'] == 'quiet day'
+    assert r.headers['ETag'] == '"1"'
+
+    _finish_today(client, 2, apps=[{'jobName': 'A', 'company': 'C', 'resume': 'r'}, {'jobName': 'B'}])
+    apps = client.get(f'/api/logs/{today}').get_json()['applications']
+    assert [(a['jobName'], a['company'], a['resume'], a['done']) for a in apps] == [
+        ('A', 'C', 'r', True), ('B', None, None, True)]
+    (day,) = client.get('/api/export_logs?format=json').get_json()
+    assert day['applications'] == apps
+    assert day['completed_count'] == 2 and day['notes'] == 'quiet day'
+
+
+def test_data_version_changes_on_every_write(client):
+    today = get_eastern_today().isoformat()
+    seen = [client.get('/api/state').get_json()['dataVersion']]
+    seen.append(_finish_today(client, 1).get_json()['dataVersion'])
+    assert _finish_today(client, 1).get_json()['dataVersion'] == seen[-1]  # no-op resubmit
+    seen.append(client.put(f'/api/logs/{today}', json={'notes': 'x'}).get_json()['dataVersion'])
+    seen.append(client.delete(f'/api/logs/{today}').get_json()['dataVersion'])
+    assert len(set(seen[:3])) == 3
+    assert seen[-1] == seen[0] == '0'  # nothing logged
+    assert client.get('/api/state').get_json()['dataVersion'] == seen[-1]
+
+
+def test_data_version_never_repeats_for_different_data(client):
+    today = get_eastern_today().isoformat()
+    first = _finish_today(client, 1, notes='first').get_json()['dataVersion']
+    client.delete(f'/api/logs/{today}')
+    # Recreated at version 1 again, with other contents.
+    recreated = _finish_today(client, 1, notes='second').get_json()['dataVersion']
+    assert recreated != first
+    client.delete('/api/reset')
+    assert _finish_today(client, 1, notes='first').get_json()['dataVersion'] not in (first, recreated)
+
+
+def test_batch_edit_creates_edits_and_deletes(client):
+    today = get_eastern_today()
+    days = [(today - timedelta(days=i)).isoformat() for i in range(4)]
+    _finish_today(client, 1, apps=[{'jobName': 'Old', 'company': 'A'}], notes='keep')
+    client.post('/api/finish_day', json={'completedCount': 1, 'elapsedSeconds': 1, 'applications': [],
+                                         'logDate': days[1]})
+    r = client.patch('/api/logs', json={'days': [
+        {'date': days[0], 'notes': 'edited', 'version': 1},   # edit, applications kept
+        {'date': days[1], 'delete': True},
+        {'date': days[2], 'applications': [{'jobName': 'X', 'company': 'B'}] * 3},  # backfill
+        {'date': days[3], 'completedCount': 0, 'elapsedSeconds': 5},
+    ]})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert [(d['date'], d['result'], d['version']) for d in body['days']] == [
+        (days[0], 'updated', 2), (days[1], 'deleted', None), (days[2], 'created', 1), (days[3], 'created', 1)]
+    assert body['totalDaysLogged'] == 3 and body['totalStreak'] == 1
+    assert client.get(f'/api/logs/{days[0]}').get_json()['applications'][0]['jobName'] == 'Old'
+    created = client.get(f'/api/session/{days[2]}').get_json()
+    assert created['completed_count'] == 3 and created['status'] == 'incomplete'  # goal is 5
+    assert client.get(f'/api/session/{days[1]}').status_code == 404
+
+    # Resending the same edit is a no-op.
+    again = client.patch('/api/logs', json={'days': [{'date': days[0], 'notes': 'edited'}]}).get_json()
+    assert again['days'] == [{'date': days[0], 'result': 'unchanged', 'version': 2}]
+
+
+def test_batch_edit_is_all_or_nothing(client):
+    today = get_eastern_today()
+    yesterday = (today - timedelta(days=1)).isoformat()
+    _finish_today(client, 1, notes='before')
+    edit = {'date': today.isoformat(), 'notes': 'after'}
+
+    stale = client.patch('/api/logs', json={'days': [edit, {'date': yesterday, 'delete': True}]})
+    assert stale.status_code == 404 and stale.get_json()['index'] == 1
+    conflict = client.patch('/api/logs', json={'days': [{'date': yesterday, 'completedCount': 1},
+                                                        {**edit, 'version': 7}]})
+    assert conflict.status_code == 409 and conflict.get_json()['version'] == 1
+    assert client.patch('/api/logs', json={'days': [edit, edit]}).get_json()['index'] == 1
+    for bad in ({'days': []}, {'days': [{'date': 'nope'}]}, {'days': [{**edit, 'completedCount': -1}]},
+                {'days': [{'date': (today + timedelta(days=1)).isoformat()}]}):
+        assert client.patch('/api/logs', json=bad).status_code == 400
+
+    assert client.get(f'/api/session/{today.isoformat()}').get_json()['notes'] == 'before'
+    assert client.get(f'/api/session/{yesterday}').status_code == 404
@@ -0,0 +1,34 @@
+from flask import Flask
+from sqlalchemy import text
+
+
+def _pragma(name):
+    from database import db
+    return db.session.execute(text(f'PRAGMA {name}')).scalar()
+
+
+def test_embedded_sqlite_file_gets_tuned_pragmas(tmp_path, monkeypatch):
+    from database import db, init_app
+    db_file = tmp_path / 'nested' / 'jobtracker.db'
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{db_file}')
+    monkeypatch.setenv('SQLITE_MMAP_SIZE', str(64 * 1024 * 1024))
+    app = Flask(__name__)
+    init_app(app)
+    with app.app_context():
+        assert _pragma('journal_mode') == 'wal'
+        assert _pragma('synchronous') == 1  # NORMAL
+        assert _pragma('foreign_keys') == 1
+        assert _pragma('temp_store') == 2  # MEMORY
+        assert _pragma('busy_timeout') == 5000
+        assert _pragma('cache_size') == -65536
+        assert _pragma('mmap_size') == 64 * 1024 * 1024
+        db.session.remove()
+        db.engine.dispose()
+    assert db_file.exists()
+
+
+def test_in_memory_test_db_enforces_foreign_keys(client):
+    import app as app_module
+    with app_module.app.app_context():
+        assert _pragma('foreign_keys') == 1
+        assert _pragma('journal_mode') == 'memory'
@@ -0,0 +1,104 @@
+"""
+Background jobs (jobs.py; POST /api/jobs/<kind>, GET /api/jobs/<id>). The
+tests run with JOB_WORKERS=0, so each job finishes inside its POST.
+"""
+import os
+
+from models import Job, get_eastern_today
+
+
+def _seed(client):
+    client.post('/api/finish_day', json={'completedCount': 1, 'elapsedSeconds': 60, 'notes': 'n',
+                                         'applications': [{'jobName': 'Eng', 'company': 'Acme'}]})
+
+
+def test_export_job_matches_inline_export(client):
+    _seed(client)
+    for fmt in ('csv', 'json'):
+        r = client.post('/api/jobs/export', json={'format': fmt})
+        assert r.status_code == 202
+        job = r.get_json()
+        assert r.headers['Location'] == f"/api/jobs/{job['id']}"
+        assert client.get(f"/api/jobs/{job['id']}").get_json()['status'] == 'succeeded'
+        result = client.get(job['resultUrl'])
+        assert result.status_code == 200
+        inline = client.get(f'/api/export_logs?format={fmt}')
+        if fmt == 'csv':
+            assert result.get_data() == inline.get_data()
+        else:
+            assert result.get_json() == inline.get_json()
+
+
+def test_snapshot_and_reset_jobs(client):
+    _seed(client)
+    snapshot = client.get(client.post('/api/jobs/snapshot').get_json()['resultUrl']).get_data()
+    job = client.post('/api/jobs/reset').get_json()
+    assert job['status'] == 'succeeded' and job['resultUrl'] is None
+    assert client.get('/api/state').get_json()['totalDaysLogged'] == 0
+    assert client.post('/api/restore', data=snapshot).status_code == 200
+    assert client.get('/api/state').get_json()['totalDaysLogged'] == 1
+
+
+def test_job_errors(client, monkeypatch):
+    import app as app_module
+    assert client.post('/api/jobs/nope').status_code == 404
+    assert client.post('/api/jobs/export', json={'format': 'xml'}).status_code == 400
+    assert client.get('/api/jobs/missing').status_code == 404
+    assert client.get('/api/jobs/missing/result').status_code == 404
+    monkeypatch.setattr(app_module.job_runner, 'max_pending', 0)
+    assert client.post('/api/jobs/export').status_code == 429
+
+
+def test_cancel_and_failure(client, monkeypatch):
+    import app as app_module
+    from database import db
+    runner = app_module.job_runner
+
+    def cancels_itself(ctx):
+        with open(ctx.result_path, 'w') as f:
+            f.write('partial')
+        runner.cancel(db.session.get(Job, ctx.job_id))
+        ctx.progress(0.5)
+
+    def fails(ctx):
+        raise RuntimeError('boom')
+
+    monkeypatch.setitem(runner._kinds, 'cancels', (cancels_itself, None))
+    monkeypatch.setitem(runner._kinds, 'fails', (fails, None))
+    job = client.post('/api/jobs/cancels').get_json()
+    assert (job['status'], job['cancelRequested'], job['resultUrl']) == ('cancelled', True, None)
+    assert not os.path.exists(os.path.join(runner.result_dir, job['id']))
+    job = client.post('/api/jobs/fails').get_json()
+    assert (job['status'], job['error']) == ('failed', 'boom')
+    # Finished jobs can't be cancelled any more.
+    assert client.post(f"/api/jobs/{job['id']}/cancel").get_json()['status'] == 'failed'
+
+
+def test_cancelled_reset_keeps_data_and_session_time(client, monkeypatch):
+    import app as app_module
+    from database import db
+    runner, timer = app_module.job_runner, app_module.session_timer
+    _seed(client)
+    client.post('/api/session/heartbeat', json={'elapsedSeconds': 500})
+
+    def reset_then_cancel(ctx):
+        app_module._reset_all()
+        runner._cancel_flags[ctx.job_id].set()  # as a cancel from another request would
+        ctx.check_cancelled()
+        db.session.commit()
+
+    monkeypatch.setitem(runner._kinds, 'reset', (reset_then_cancel, None))
+    assert client.post('/api/jobs/reset').get_json()['status'] == 'cancelled'
+    assert client.get('/api/state').get_json()['totalDaysLogged'] == 1
+    assert timer.peek(get_eastern_today()) == (500, False)
+
+
+def test_recover_marks_interrupted_jobs_failed(client):
+    import app as app_module
+    from database import db
+    with app_module.app.app_context():
+        db.session.add(Job(id='x' * 32, kind='export', status='running'))
+        db.session.commit()
+        app_module.job_runner.recover()
+    job = client.get(f"/api/jobs/{'x' * 32}").get_json()
+    assert job['status'] == 'failed' and 'restart' in job['error']
@@ -0,0 +1,69 @@
+"""
+Tests for the opt-in request profiler. Each test builds a throwaway Flask app so
+the PROFILE_* settings don't leak into the main app imported by test_api.py.
+"""
+import os
+import pstats
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from profiling import init_profiling
+
+
+def _make_app(**config):
+    app = Flask(__name__)
+    app.config.update(TESTING=True, **config)
+
+    @app.route('/api/slow')
+    def slow():
+        return {"total": sum(i * i for i in range(20000))}
+
+    init_profiling(app)
+    return app
+
+
+def test_disabled_registers_nothing(monkeypatch):
+    monkeypatch.delenv('PROFILE_DIR', raising=False)
+    app = _make_app()
+    assert not app.before_request_funcs
+    assert not app.teardown_request_funcs
+    assert app.test_client().get('/api/debug/profiles').status_code == 404
+
+
+def test_token_triggers_profile_and_listing(tmp_path):
+    app = _make_app(PROFILE_DIR=str(tmp_path), PROFILE_TOKEN='s3cret')
+    c = app.test_client()
+    assert c.get('/api/slow').status_code == 200
+    assert c.get('/api/slow', headers={'X-Profile-Token': 'wrong'}).status_code == 200
+    assert os.listdir(tmp_path) == []
+
+    assert c.get('/api/slow?profile_token=s3cret').status_code == 200
+    assert c.get('/api/debug/profiles').status_code == 403
+    listing = c.get('/api/debug/profiles', headers={'X-Profile-Token': 's3cret'}).get_json()
+    (profile,) = listing['profiles']
+    assert profile['endpoint'] == 'slow'
+    assert profile['status'] == 200
+    assert sorted(f.rsplit('.', 1)[1] for f in profile['files']) == ['collapsed', 'json', 'prof']
+
+    stem = os.path.join(str(tmp_path), profile['id'])
+    assert pstats.Stats(stem + '.prof').total_tt > 0
+    with open(stem + '.collapsed') as f:
+        lines = f.read().splitlines()
+    assert lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert any('slow (test_profiling.py' in line for line in lines)
+
+    r = c.get(f"/api/debug/profiles/{profile['id']}.collapsed", headers={'X-Profile-Token': 's3cret'})
+    assert r.status_code == 200
+
+
+def test_sampling_and_retention(tmp_path):
+    app = _make_app(PROFILE_DIR=str(tmp_path), PROFILE_SAMPLE_RATE=1.0, PROFILE_KEEP=2)
+    c = app.test_client()
+    for _ in range(4):
+        c.get('/api/slow')
+    assert len([n for n in os.listdir(tmp_path) if n.endswith('.prof')]) == 2
+    # Sampling alone doesn't open the listing: no token is configured.
+    assert c.get('/api/debug/profiles').status_code == 403
@@ -0,0 +1,119 @@
+"""
+Per-endpoint SQL statement budgets.
+
+Each endpoint is exercised against seeded histories of several sizes and the
+statements it issues are counted (tests/query_counter.py). The test fails when
+an endpoint exceeds the budget declared in tests/query_budgets.json for that
+size, or when its count grows with the number of rows (an N+1 pattern).
+
+To change a budget on purpose, edit query_budgets.json in the same commit and
+say why in the message.
+"""
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from query_counter import QueryCounter
+
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'query_budgets.json')
+with open(BUDGET_FILE, encoding='utf-8') as f:
+    BUDGETS = json.load(f)
+
+# {"small": {"days": 1, "appsPerDay": 1}, ...}: history length and the number of
+# applications per day (also the size of the finish/edit payloads) grow together.
+SIZES = BUDGETS['sizes']
+
+
+def _seed(app_module, days, apps_per_day):
+    """ Inserts `days` consecutive logged days ending today, directly via the ORM. """
+    from database import db
+    from models import DailyLog, ApplicationLog, get_eastern_today, get_settings
+
+    today = get_eastern_today()
+    with app_module.app.app_context():
+        get_settings()
+        for i in range(days):
+            d = today - timedelta(days=i)
+            db.session.add(DailyLog(log_date=d, status='complete' if i % 3 else 'incomplete',
+                                    completed_count=apps_per_day, elapsed_seconds=600))
+            for j in range(apps_per_day):
+                db.session.add(ApplicationLog(log_date=d, job_name=f'Job {j}', company=f'Co {j}',
+                                              resume_used='v1', timestamp=datetime(2024, 1, 1, 9) + timedelta(seconds=j)))
+        db.session.commit()
+    return today
+
+
+def _requests(today, days, apps_per_day):
+    """ (method, path, json) for every budgeted endpoint, keyed like the budget file. """
+    iso = today.isoformat()
+    oldest = (today - timedelta(days=days - 1)).isoformat()
+    apps = [{'jobName': f'New {j}', 'company': 'Acme', 'resume': 'v2'} for j in range(apps_per_day)]
+    return {
+        'GET /api/state': ('GET', '/api/state', None),
+        'GET /api/session/<date>': ('GET', f'/api/session/{iso}', None),
+        'GET /api/calendar_data': ('GET', f'/api/calendar_data?month={today.month}&year={today.year}', None),
+        'GET /api/logs/<date>': ('GET', f'/api/logs/{iso}', None),
+        'GET /api/analytics': ('GET', '/api/analytics', None),
+        'GET /api/goal_history': ('GET', '/api/goal_history', None),
+        'GET /api/export_logs?format=json': ('GET', '/api/export_logs?format=json', None),
+        'GET /api/export_logs?format=csv': ('GET', '/api/export_logs?format=csv', None),
+        'GET /api/debug_streaks': ('GET', '/api/debug_streaks', None),
+        'GET /api/changes': ('GET', '/api/changes?since=0&limit=100', None),
+        # Runs before the other writes. Edits every day but the newest, deletes
+        # the newest (finish_day recreates it) and backfills the day before the oldest.
+        'PATCH /api/logs': ('PATCH', '/api/logs', {'days': [
+            *({'date': (today - timedelta(days=i)).isoformat(), 'notes': 'batch', 'applications': apps}
+              for i in range(1, days)),
+            {'date': iso, 'delete': True},
+            {'date': (today - timedelta(days=days)).isoformat(), 'completedCount': 1, 'applications': apps},
+        ]}),
+        'POST /api/finish_day': ('POST', '/api/finish_day', {
+            'completedCount': apps_per_day, 'elapsedSeconds': 900, 'applications': apps}),
+        'PUT /api/logs/<date>': ('PUT', f'/api/logs/{iso}', {'notes': 'edited', 'applications': apps}),
+        'DELETE /api/logs/<date>': ('DELETE', f'/api/logs/{oldest}', None),
+    }
+
+
+def _measure(client, size):
+    import app as app_module
+    from database import db
+
+    days, apps_per_day = SIZES[size]['days'], SIZES[size]['appsPerDay']
+    today = _seed(app_module, days, apps_per_day)
+    counts = {}
+    for name, (method, path, body) in _requests(today, days, apps_per_day).items():
+        with app_module.app.app_context():
+            engine = db.engine
+        with QueryCounter(engine) as qc:
+            resp = client.open(path, method=method, json=body)
+        assert resp.status_code == 200, (name, resp.status_code, resp.get_data(as_text=True))
+        counts[name] = qc
+    return counts
+
+
+@pytest.mark.parametrize('size', list(SIZES))
+def test_endpoint_query_budgets(client, size):
+    counts = _measure(client, size)
+    assert set(counts) == set(BUDGETS['endpoints']), 'query_budgets.json is out of sync with the endpoints tested'
+    over = {
+        name: (qc.count, BUDGETS['endpoints'][name][size], qc.statements)
+        for name, qc in counts.items()
+        if qc.count > BUDGETS['endpoints'][name][size]
+    }
+    assert not over, f'Endpoints over their SQL budget at size {size!r}: {over}'
+
+
+def test_query_count_does_not_grow_with_history(client):
+    import app as app_module
+    from database import db
+
+    smallest, largest = list(SIZES)[0], list(SIZES)[-1]
+    small = {name: qc.count for name, qc in _measure(client, smallest).items()}
+    with app_module.app.app_context():
+        db.drop_all()
+        db.create_all()
+    large = _measure(client, largest)
+    grew = {name: (small[name], qc.count, qc.statements) for name, qc in large.items() if qc.count > small[name]}
+    assert not grew, f'Query count grows with row count (N+1?): {grew}'
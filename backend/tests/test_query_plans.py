@@ -0,0 +1,60 @@
+"""
+Query-plan regression checks. Every filtered statement the budgeted endpoints
+issue (tests/test_query_budget.py) must reach the large tables through an
+index, never a full scan. Runs on the suite's SQLite database, or on a local
+Postgres when DATABASE_URL points at one (see tests/query_plans.py).
+"""
+from sqlalchemy import inspect
+
+from query_plans import QueryPlanRecorder
+from test_query_budget import SIZES, _seed, _requests
+
+LARGE_TABLES = {'daily_logs', 'application_logs', 'goal_history', 'tombstones'}
+# Names the primary-key index of daily_logs gets on SQLite and Postgres.
+DAILY_LOGS_PK = ('sqlite_autoindex_daily_logs_1', 'daily_logs_pkey')
+
+
+def _record_plans(client):
+    import app as app_module
+    from database import db
+
+    size = SIZES['large']
+    today = _seed(app_module, size['days'], size['appsPerDay'])
+    with app_module.app.app_context():
+        engine = db.engine
+    recorded = {}
+    for name, (method, path, body) in _requests(today, size['days'], size['appsPerDay']).items():
+        with QueryPlanRecorder(engine) as qp:
+            resp = client.open(path, method=method, json=body)
+        assert resp.status_code == 200, (name, resp.status_code, resp.get_data(as_text=True))
+        recorded[name] = qp
+    return recorded
+
+
+def test_endpoints_reach_large_tables_through_indexes(client):
+    recorded = _record_plans(client)
+    scans = {name: qp.full_scans(LARGE_TABLES) for name, qp in recorded.items() if qp.full_scans(LARGE_TABLES)}
+    assert not scans, f'Full scans of large tables (missing index?): {scans}'
+
+    # The calendar's month range is a primary-key range scan.
+    (statement, plan), = recorded['GET /api/calendar_data'].plans
+    assert any(pk in line for line in plan for pk in DAILY_LOGS_PK), (statement, plan)
+
+
+def test_foreign_keys_are_indexed(client):
+    """ A child table's foreign key must lead some index: it is joined on, deleted
+    by and checked on every parent delete. """
+    import app as app_module
+    from database import db
+
+    with app_module.app.app_context():
+        inspector = inspect(db.engine)
+        missing = []
+        for table in inspector.get_table_names():
+            leading = [index['column_names'] for index in inspector.get_indexes(table)]
+            leading.append(inspector.get_pk_constraint(table)['constrained_columns'])
+            for fk in inspector.get_foreign_keys(table):
+                columns = fk['constrained_columns']
+                if not any(cols[:len(columns)] == columns for cols in leading):
+                    missing.append((table, columns))
+    assert not missing, f'Foreign keys without an index: {missing}'
@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+from models import get_eastern_today
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _timer(app_module, clock, grace=60):
+    from session_timer import SessionTimerBuffer
+    return SessionTimerBuffer(app_module.app, grace_seconds=grace, clock=clock)
+
+
+def _elapsed_in_db(app_module, log_date):
+    from database import db
+    from models import DailyLog
+    with app_module.app.app_context():
+        return db.session.get(DailyLog, log_date).elapsed_seconds
+
+
+def test_heartbeats_accumulate_and_pause(client):
+    import app as app_module
+    clock, today = FakeClock(), get_eastern_today()
+    timer = _timer(app_module, clock)
+    with app_module.app.app_context():
+        assert timer.heartbeat(today, paused=False, seed_seconds=5) == (5, False)
+        clock.now += 10.5
+        assert timer.heartbeat(today, paused=True) == (15, True)   # time up to the pause counts
+        clock.now += 300
+        assert timer.heartbeat(today, paused=True) == (15, True)   # paused time doesn't
+        assert timer.heartbeat(today, paused=False) == (15, False)
+        clock.now += 9.6
+        assert timer.heartbeat(today, paused=False) == (24, False)
+        clock.now += 0.5                                            # the leftover 0.6s carries over
+        assert timer.heartbeat(today, paused=False) == (25, False)
+        # A missed beat (closed tab, sleep) only ever adds the grace period.
+        clock.now += 3600
+        assert timer.heartbeat(today, paused=False) == (85, False)
+
+
+def test_flush_writes_existing_days_without_bumping_version(client):
+    import app as app_module
+    clock, today = FakeClock(), get_eastern_today()
+    yesterday = today - timedelta(days=1)
+    client.post('/api/finish_day', json={'completedCount': 1, 'elapsedSeconds': 100, 'applications': []})
+    version = client.get(f'/api/logs/{today.isoformat()}').get_json()['version']
+
+    timer = _timer(app_module, clock)
+    with app_module.app.app_context():
+        timer.heartbeat(today, paused=False)
+        timer.heartbeat(yesterday, paused=False)  # no row: stays buffered, nothing created
+        clock.now += 30
+        timer.heartbeat(today, paused=False)
+        timer.heartbeat(yesterday, paused=False)
+    assert timer.flush() == 1  # only today has a row
+    assert timer.flush() == 0  # nothing changed since
+
+    assert _elapsed_in_db(app_module, today) == 130
+    assert client.get(f'/api/logs/{today.isoformat()}').get_json()['version'] == version
+    assert client.get(f'/api/session/{yesterday.isoformat()}').status_code == 404
+    # A day without a row keeps its time buffered until finish_day creates it,
+    # even once a later day is buffered too.
+    assert timer.peek(yesterday) == (30, False)
+    # The cleared content hash means the same finish payload is written again.
+    r = client.post('/api/finish_day', json={'completedCount': 1, 'elapsedSeconds': 100, 'applications': []})
+    assert 'unchanged' not in r.get_json()['message']
+
+
+def test_heartbeat_endpoint_and_session_overlay(client):
+    import app as app_module
+    today = get_eastern_today().isoformat()
+    # sendBeacon posts text/plain; the body is still parsed.
+    r = client.post('/api/session/heartbeat', data='{"paused": true, "elapsedSeconds": 42}',
+                    content_type='text/plain')
+    assert r.status_code == 200
+    assert r.get_json() == {'logDate': today, 'elapsedSeconds': 42, 'paused': True}
+
+    # Unfinished day: 404, but the timer survives a reload.
+    resp = client.get(f'/api/session/{today}')
+    assert resp.status_code == 404
+    assert resp.get_json()['elapsed_seconds'] == 42
+
+    # Finishing supersedes the buffered time.
+    client.post('/api/finish_day', json={'completedCount': 0, 'elapsedSeconds': 50, 'applications': []})
+    assert app_module.session_timer.peek(get_eastern_today()) is None
+    assert client.get(f'/api/session/{today}').get_json()['elapsed_seconds'] == 50
+
+    tomorrow = (get_eastern_today() + timedelta(days=1)).isoformat()
+    assert client.post('/api/session/heartbeat', json={'logDate': tomorrow}).status_code == 400
+    assert client.post('/api/session/heartbeat', json={'elapsedSeconds': -1}).status_code == 400
+
+
+def test_buffer_is_dropped_only_when_the_overwriting_write_commits(client):
+    import app as app_module
+    from database import db
+    timer, today = app_module.session_timer, get_eastern_today()
+    client.post('/api/finish_day', json={'completedCount': 1, 'elapsedSeconds': 100, 'applications': []})
+    client.post('/api/session/heartbeat', json={'elapsedSeconds': 500})
+    assert timer.peek(today) == (500, False)
+
+    with app_module.app.app_context():
+        timer.discard_on_commit(today)
+        assert timer.flush() == 0  # held: the pending write owns elapsed_seconds
+        db.session.rollback()
+    assert timer.peek(today) == (500, False)  # failed write: heartbeats kept
+    assert timer.flush() == 1
+    assert _elapsed_in_db(app_module, today) == 500
+
+    # A conflicting finish (stale If-Match) doesn't drop them either.
+    r = client.post('/api/finish_day', json={'completedCount': 1, 'elapsedSeconds': 60, 'applications': []},
+                    headers={'If-Match': '"999"'})
+    assert r.status_code == 409 and timer.peek(today) == (500, False)
+    r = client.put(f'/api/logs/{today.isoformat()}', json={'elapsedSeconds': 60})
+    assert r.status_code == 200 and timer.peek(today) is None
+    assert _elapsed_in_db(app_module, today) == 60
+
+
+def test_failed_batch_edit_keeps_buffered_time(client):
+    import app as app_module
+    timer, today = app_module.session_timer, get_eastern_today()
+    client.post('/api/finish_day', json={'completedCount': 1, 'elapsedSeconds': 100, 'applications': []})
+    client.post('/api/session/heartbeat', json={'elapsedSeconds': 500})
+
+    edit = {'date': today.isoformat(), 'elapsedSeconds': 60}
+    missing = {'date': (today - timedelta(days=1)).isoformat(), 'delete': True}
+    assert client.patch('/api/logs', json={'days': [edit, missing]}).status_code == 404
+    assert timer.peek(today) == (500, False)
+    assert client.patch('/api/logs', json={'days': [edit]}).status_code == 200
+    assert timer.peek(today) is None
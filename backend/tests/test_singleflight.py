@@ -0,0 +1,100 @@
+"""
+Request coalescing (singleflight.py) for /api/state, /api/analytics and exports.
+"""
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def _start_leader(flights, key, fn):
+    """ Runs flights.do(key, fn) in a thread; returns (thread, results list). """
+    results = []
+    thread = threading.Thread(target=lambda: results.append(flights.do(key, fn)))
+    thread.start()
+    return thread, results
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'answer': len(calls)}
+
+    leader, results = _start_leader(flights, 'status', compute)
+    started.wait(5)
+    followers = [_start_leader(flights, 'status', compute) for _ in range(5)]
+    time.sleep(0.2)  # let the followers reach the in-flight call
+    release.set()
+    for thread, _results in [(leader, results)] + followers:
+        thread.join(5)
+    assert len(calls) == 1
+    assert all(r == [{'answer': 1}] for r in [results] + [f[1] for f in followers])
+    # Nothing is cached once the flight lands.
+    assert flights.do('status', lambda: 'fresh') == 'fresh'
+
+
+def test_errors_are_shared_and_keys_are_independent():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise RuntimeError('boom')
+
+    errors = []
+
+    def call():
+        try:
+            flights.do('analytics', fail)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    started.wait(5)
+    threads += [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads[1:]:
+        thread.start()
+    # A different key doesn't wait on the failing flight.
+    assert flights.do('export', lambda: 'export') == 'export'
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(errors) == 4 and len({id(e) for e in errors}) == 1
+    with pytest.raises(RuntimeError):
+        flights.do('analytics', fail)
+
+
+def test_callers_after_a_commit_start_a_new_flight(client):
+    import app as app_module
+    flights = app_module.flights
+    before = flights.generation
+    client.post('/api/finish_day', json={'completedCount': 1, 'elapsedSeconds': 5, 'applications': []})
+    assert flights.generation > before
+
+    # A flight still reading the old rows isn't joined after the commit.
+    started, release = threading.Event(), threading.Event()
+
+    def stale():
+        started.set()
+        release.wait(5)
+        return 'stale'
+
+    leader, results = _start_leader(flights, 'status', stale)
+    started.wait(5)
+    flights.invalidate()
+    assert flights.do('status', lambda: 'fresh') == 'fresh'
+    release.set()
+    leader.join(5)
+    assert results == ['stale']
+    assert client.get('/api/state').get_json()['totalDaysLogged'] == 1
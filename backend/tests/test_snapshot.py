@@ -0,0 +1,115 @@
+"""
+Binary snapshot / restore (GET /api/snapshot, POST /api/restore; see snapshot.py).
+"""
+import io
+from datetime import timedelta
+
+from flask import Flask
+from sqlalchemy import insert
+
+from models import get_eastern_today
+
+
+def _seed(client):
+    yesterday = (get_eastern_today() - timedelta(days=1)).isoformat()
+    client.put('/api/goal', json={'goal': 2})
+    client.post('/api/finish_day', json={'completedCount': 2, 'elapsedSeconds': 90, 'logDate': yesterday,
+                                         'notes': 'déjà vu', 'applications': [
+                                             {'jobName': 'B', 'company': 'Acme'}, {'jobName': 'A'}]})
+    client.post('/api/finish_day', json={'completedCount': 1, 'elapsedSeconds': 30, 'applications': []})
+
+
+def _everything(client):
+    return (client.get('/api/export_logs?format=json').get_json(),
+            client.get('/api/goal_history').get_json(),
+            client.get('/api/state').get_json())
+
+
+def test_snapshot_round_trip(client):
+    _seed(client)
+    before = _everything(client)
+    r = client.get('/api/snapshot')
+    assert r.status_code == 200 and r.mimetype == 'application/octet-stream'
+    snapshot = r.get_data()
+    assert snapshot.startswith(b'JTSNAP\x01')
+
+    client.delete('/api/reset')
+    cursor = client.get('/api/changes').get_json()['cursor']
+    restored = client.post('/api/restore', data=snapshot)
+    assert restored.status_code == 200
+    assert restored.get_json()['restored'] == {
+        'settings': 1, 'daily_logs': 2, 'goal_history': 1, 'application_logs': 2}
+    # Application ids are reassigned; everything else comes back as it was.
+    after = _everything(client)
+    for day in before[0] + after[0]:
+        for a in day['applications']:
+            del a['id']
+    # Clients must refetch: the restore is a new data version, not the old one.
+    assert after[2].pop('dataVersion') != before[2].pop('dataVersion')
+    assert after == before
+    # Sync clients see a reset followed by the restored rows.
+    changes = client.get(f'/api/changes?since={cursor}').get_json()['changes']
+    assert changes[0]['op'] == 'reset' and len(changes) == 1 + 6
+    # The restored days are still no-op on identical re-submits.
+    assert 'unchanged' in client.post('/api/finish_day', json={
+        'completedCount': 1, 'elapsedSeconds': 30, 'applications': []}).get_json()['message']
+
+
+def test_restore_rejects_bad_files_without_changes(client):
+    _seed(client)
+    snapshot = client.get('/api/snapshot').get_data()
+    before = _everything(client)
+
+    flipped = bytearray(snapshot)
+    flipped[-20] ^= 0xFF
+    for bad in (b'', b'not a snapshot', snapshot[:-5], bytes(flipped),
+                b'JTSNAP\x09' + snapshot[7:]):
+        r = client.post('/api/restore', data=bad)
+        assert r.status_code == 400, bad[:16]
+    assert _everything(client) == before
+
+
+def test_session_time_is_dropped_only_by_a_successful_restore(client):
+    import app as app_module
+    timer, today = app_module.session_timer, get_eastern_today()
+    _seed(client)
+    snapshot = client.get('/api/snapshot').get_data()
+    client.post('/api/session/heartbeat', json={'elapsedSeconds': 500})
+
+    assert client.post('/api/restore', data=snapshot[:-5]).status_code == 400
+    assert timer.peek(today) == (500, False)
+    assert client.post('/api/restore', data=snapshot).status_code == 200
+    assert timer.peek(today) is None
+
+
+def test_snapshot_is_one_consistent_read_on_sqlite(tmp_path, monkeypatch):
+    from database import db, init_app
+    from models import ApplicationLog, DailyLog
+    from snapshot import read_snapshot, stream_snapshot
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'jobtracker.db'}")
+    app = Flask(__name__)
+    init_app(app)
+    today = get_eastern_today()
+
+    def add_day(conn, day):
+        conn.execute(insert(DailyLog.__table__).values(log_date=day, completed_count=1))
+        conn.execute(insert(ApplicationLog.__table__).values(log_date=day, job_name='Eng'))
+
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as conn:
+            add_day(conn, today - timedelta(days=1))
+        chunks = []
+        for chunk in stream_snapshot(db.engine):
+            chunks.append(chunk)
+            if len(chunks) > 1 and chunk[0] == 2:  # daily_logs frame
+                # A finish_day commits between the daily_logs and application_logs reads.
+                with db.engine.begin() as conn:
+                    add_day(conn, today)
+        db.engine.dispose()
+
+    tables = {}
+    for table, rows in read_snapshot(io.BytesIO(b''.join(chunks))):
+        tables.setdefault(table.name, []).extend(rows)
+    assert [d['log_date'] for d in tables['daily_logs']] == [today - timedelta(days=1)]
+    assert [a['log_date'] for a in tables['application_logs']] == [today - timedelta(days=1)]
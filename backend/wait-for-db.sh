@@ -7,6 +7,11 @@ host="$1"
 shift
 cmd="$@"
 
+# Embedded SQLite mode has no database server to wait for.
+case "$DATABASE_URL" in
+  sqlite:*) exec $cmd ;;
+esac
+
 # Use netcat (nc) which we install in the Dockerfile
 echo "Waiting for database host $host using netcat..."
 until nc -z "$host" 5432; do
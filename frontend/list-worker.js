@@ -0,0 +1,55 @@
+// frontend/list-worker.js
+//
+// Filters and sorts large application lists off the main thread, so typing in
+// a filter box stays responsive however many applications a day holds.
+//
+// Messages from the page:
+//   { type: 'load',  list, items }   items: [[jobName, company, resume], ...]
+//   { type: 'query', list, seq, query, sortKey, sortDir }
+//   { type: 'drop',  list }
+// Replies to 'query' with { list, seq, order }, where `order` is an Int32Array
+// of indexes into the loaded items (transferred, not copied). The page ignores
+// replies whose seq is older than its latest query.
+const COLUMNS = { jobName: 0, company: 1, resume: 2 };
+const collator = new Intl.Collator(undefined, { sensitivity: 'base', numeric: true });
+const lists = new Map(); // list -> { items, folded }
+
+const fold = (value) => (value || '').toLocaleLowerCase();
+
+function load(list, items) {
+    lists.set(list, { items, folded: items.map(row => row.map(fold).join('\u001f')) });
+}
+
+// Every whitespace-separated term must appear in some column; the original
+// (logged) order is kept unless a sort column is given. Empty values sort last.
+function query(list, text, sortKey, sortDir) {
+    const entry = lists.get(list);
+    if (!entry) return new Int32Array(0);
+    const terms = fold(text).split(/\s+/).filter(Boolean);
+    const order = [];
+    for (let i = 0; i < entry.items.length; i++) {
+        if (terms.every(term => entry.folded[i].includes(term))) order.push(i);
+    }
+    const column = COLUMNS[sortKey];
+    if (column !== undefined) {
+        const sign = sortDir === 'desc' ? -1 : 1;
+        order.sort((a, b) => {
+            const x = entry.items[a][column] || '', y = entry.items[b][column] || '';
+            if (!x || !y) return (!x) - (!y) || a - b;
+            return sign * collator.compare(x, y) || a - b;
+        });
+    }
+    return Int32Array.from(order);
+}
+
+self.onmessage = (event) => {
+    const msg = event.data || {};
+    if (msg.type === 'load') {
+        load(msg.list, msg.items || []);
+    } else if (msg.type === 'drop') {
+        lists.delete(msg.list);
+    } else if (msg.type === 'query') {
+        const order = query(msg.list, msg.query, msg.sortKey, msg.sortDir);
+        self.postMessage({ list: msg.list, seq: msg.seq, order }, [order.buffer]);
+    }
+};
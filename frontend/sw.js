@@ -0,0 +1,257 @@
+// frontend/sw.js
+//
+// Offline-first service worker for the tracker:
+//   - Precaches the app shell (index.html, list-worker.js) and caches CDN assets on first use,
+//     so repeat loads render without waiting on the network.
+//   - Serves API GETs stale-while-revalidate: the cached copy answers at once
+//     and the network response refreshes the cache in the background. GETs the
+//     page makes with `cache: 'no-store'` (its dataVersion checks and the
+//     calendar/day cache it keys on them) go network-first instead, and only
+//     fall back to the cached copy when offline.
+//   - Queues day-finish (POST /api/finish_day) and log-edit (PUT /api/logs/<date>)
+//     writes in IndexedDB when the backend can't be reached, and replays them
+//     in order once connectivity returns (Background Sync where supported, plus
+//     a 'replay-outbox' message the page sends on the 'online' event).
+//
+// Bump the cache version when the shell changes shape so old caches are dropped.
+const VERSION = 'v3';
+const SHELL_CACHE = `jobtracker-shell-${VERSION}`;
+const API_CACHE = `jobtracker-api-${VERSION}`;
+const SHELL_ASSETS = ['./', './index.html', './list-worker.js'];
+const CDN_HOSTS = ['cdn.tailwindcss.com', 'cdnjs.cloudflare.com', 'fonts.googleapis.com', 'fonts.gstatic.com'];
+// Never served from cache: time must be live, exports and snapshots are
+// one-off downloads, the change feed must be read fresh from its cursor, and
+// timer heartbeats must neither be queued nor invalidate the API cache.
+// Background jobs (/api/jobs/...) are polled for live status, so they bypass too.
+const API_PASSTHROUGH = ['/api/server_time', '/api/health', '/api/export_logs', '/api/session/heartbeat',
+                         '/api/changes', '/api/snapshot'];
+const OUTBOX_DB = 'jobtracker-sync';
+const OUTBOX_STORE = 'outbox';
+const SYNC_TAG = 'jobtracker-outbox';
+
+// --- Lifecycle ---
+self.addEventListener('install', (event) => {
+    event.waitUntil(caches.open(SHELL_CACHE).then(cache => cache.addAll(SHELL_ASSETS)).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil((async () => {
+        const keep = new Set([SHELL_CACHE, API_CACHE]);
+        const names = await caches.keys();
+        await Promise.all(names.filter(n => n.startsWith('jobtracker-') && !keep.has(n)).map(n => caches.delete(n)));
+        await self.clients.claim();
+    })());
+});
+
+// --- Routing ---
+const isApi = (url) => url.pathname.startsWith('/api/');
+const isQueueableWrite = (request, url) =>
+    (request.method === 'POST' && url.pathname === '/api/finish_day') ||
+    (request.method === 'PUT' && /^\/api\/logs\/\d{4}-\d{2}-\d{2}$/.test(url.pathname));
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    const url = new URL(request.url);
+
+    if (isApi(url)) {
+        if (API_PASSTHROUGH.includes(url.pathname) || url.pathname.startsWith('/api/jobs/')) return;
+        if (request.method === 'GET') {
+            event.respondWith(request.cache === 'no-store' ? networkFirst(request) : staleWhileRevalidate(event, request));
+        } else if (isQueueableWrite(request, url)) {
+            event.respondWith(queueableWrite(event, request));
+        } else {
+            event.respondWith(writeThrough(request));
+        }
+        return;
+    }
+    if (request.method !== 'GET') return;
+    if (request.mode === 'navigate') {
+        event.respondWith(shellFirst(event, request));
+    } else if (url.origin === self.location.origin || CDN_HOSTS.includes(url.hostname)) {
+        event.respondWith(cacheFirst(request));
+    }
+});
+
+// --- Strategies ---
+async function shellFirst(event, request) {
+    const cache = await caches.open(SHELL_CACHE);
+    const cached = await cache.match(request, { ignoreSearch: true }) || await cache.match('./index.html');
+    const network = fetch(request).then(resp => {
+        if (resp.ok) cache.put('./index.html', resp.clone());
+        return resp;
+    });
+    if (cached) {
+        event.waitUntil(network.catch(() => {}));
+        return cached;
+    }
+    return network;
+}
+
+async function cacheFirst(request) {
+    const cache = await caches.open(SHELL_CACHE);
+    const cached = await cache.match(request);
+    if (cached) return cached;
+    const resp = await fetch(request);
+    // Opaque (no-cors) CDN responses report status 0 but are still usable.
+    if (resp.ok || resp.type === 'opaque') cache.put(request, resp.clone());
+    return resp;
+}
+
+async function staleWhileRevalidate(event, request) {
+    const cache = await caches.open(API_CACHE);
+    const cached = await cache.match(request);
+    const network = fetch(request).then(resp => {
+        if (resp.ok) cache.put(request, resp.clone());
+        return resp;
+    });
+    if (cached) {
+        event.waitUntil(network.catch(() => {}));
+        return cached;
+    }
+    try {
+        return await network;
+    } catch (e) {
+        return jsonResponse(503, { error: 'Offline and no cached copy of this data yet.', offline: true });
+    }
+}
+
+async function networkFirst(request) {
+    const cache = await caches.open(API_CACHE);
+    try {
+        const resp = await fetch(request);
+        if (resp.ok) await cache.put(request, resp.clone());
+        return resp;
+    } catch (e) {
+        const cached = await cache.match(request);
+        return cached || jsonResponse(503, { error: 'Offline and no cached copy of this data yet.', offline: true });
+    }
+}
+
+// Any successful write can change what every cached GET would return.
+async function writeThrough(request) {
+    const resp = await fetch(request);
+    if (resp.ok) await caches.delete(API_CACHE);
+    return resp;
+}
+
+async function queueableWrite(event, request) {
+    const entry = {
+        url: request.url,
+        method: request.method,
+        headers: pickHeaders(request.headers),
+        body: await request.clone().text(),
+        queuedAt: Date.now(),
+    };
+    // Keep writes ordered: if anything is already waiting, go behind it.
+    if (await outboxCount() === 0) {
+        try {
+            return await writeThrough(request);
+        } catch (e) {
+            // Network failure: fall through and queue.
+        }
+    }
+    await outboxAdd(entry);
+    if (self.registration.sync) {
+        try { await self.registration.sync.register(SYNC_TAG); } catch (e) {}
+    }
+    // If we queued only to preserve ordering, the network may be fine: try now.
+    event.waitUntil(replayOutbox().catch(() => {}));
+    return jsonResponse(202, {
+        queued: true,
+        message: 'Offline: saved on this device and will sync when the server is reachable.',
+    });
+}
+
+function pickHeaders(headers) {
+    const out = {};
+    for (const name of ['Content-Type', 'If-Match']) {
+        const value = headers.get(name);
+        if (value) out[name] = value;
+    }
+    return out;
+}
+
+function jsonResponse(status, body) {
+    return new Response(JSON.stringify(body), { status, headers: { 'Content-Type': 'application/json' } });
+}
+
+// --- Outbox replay ---
+self.addEventListener('sync', (event) => {
+    if (event.tag === SYNC_TAG) event.waitUntil(replayOutbox());
+});
+
+self.addEventListener('message', (event) => {
+    if (event.data && event.data.type === 'replay-outbox') event.waitUntil(replayOutbox());
+});
+
+let replaying = null;
+function replayOutbox() {
+    // Coalesce overlapping triggers (sync event + online message) into one pass.
+    if (!replaying) replaying = drainOutbox().finally(() => { replaying = null; });
+    return replaying;
+}
+
+async function drainOutbox() {
+    const entries = await outboxAll();
+    if (entries.length === 0) return;
+    let replayed = 0;
+    for (const entry of entries) {
+        let resp;
+        try {
+            resp = await fetch(entry.url, { method: entry.method, headers: entry.headers, body: entry.body });
+        } catch (e) {
+            // Still offline: stop here and keep the rest in order. Throwing makes
+            // Background Sync retry later.
+            await notifyClients({ type: 'outbox-pending', remaining: entries.length - replayed });
+            throw e;
+        }
+        if (resp.status >= 500) {
+            await notifyClients({ type: 'outbox-pending', remaining: entries.length - replayed });
+            throw new Error(`Server error ${resp.status} replaying queued write`);
+        }
+        // 2xx applied; 4xx (validation, 409 conflict) will never succeed on retry.
+        await outboxDelete(entry.id);
+        replayed++;
+        if (!resp.ok) {
+            const err = await resp.json().catch(() => ({}));
+            await notifyClients({ type: 'outbox-rejected', status: resp.status, url: entry.url, error: err.error || resp.statusText });
+        }
+    }
+    await caches.delete(API_CACHE);
+    await notifyClients({ type: 'outbox-drained', replayed });
+}
+
+async function notifyClients(message) {
+    const clients = await self.clients.matchAll({ includeUncontrolled: true, type: 'window' });
+    clients.forEach(c => c.postMessage(message));
+}
+
+// --- Minimal IndexedDB wrapper (one object store, autoincrement keys = FIFO order) ---
+function openOutbox() {
+    return new Promise((resolve, reject) => {
+        const req = indexedDB.open(OUTBOX_DB, 1);
+        req.onupgradeneeded = () => req.result.createObjectStore(OUTBOX_STORE, { keyPath: 'id', autoIncrement: true });
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => reject(req.error);
+    });
+}
+
+async function outboxTx(mode, fn) {
+    const db = await openOutbox();
+    try {
+        return await new Promise((resolve, reject) => {
+            const tx = db.transaction(OUTBOX_STORE, mode);
+            const req = fn(tx.objectStore(OUTBOX_STORE));
+            tx.oncomplete = () => resolve(req.result);
+            tx.onerror = () => reject(tx.error);
+            tx.onabort = () => reject(tx.error);
+        });
+    } finally {
+        db.close();
+    }
+}
+
+const outboxAdd = (entry) => outboxTx('readwrite', store => store.add(entry));
+const outboxAll = () => outboxTx('readonly', store => store.getAll());
+const outboxCount = () => outboxTx('readonly', store => store.count());
+const outboxDelete = (id) => outboxTx('readwrite', store => store.delete(id));
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""HTTP load generator for the backend API, with latency SLO gating.
+
+Drives a weighted mix of the endpoints in backend/app.py from a pool of worker
+threads and reports throughput and p50/p95/p99 latency per endpoint:
+
+    state     GET  /api/state
+    session   GET  /api/session/<today>
+    calendar  GET  /api/calendar_data?month=&year=
+    finish    POST /api/finish_day   (application list grows with every call)
+    edit      PUT  /api/logs/<today>
+    analytics GET  /api/analytics
+
+The write endpoints overwrite *today's* log, so by default the script starts
+its own throwaway server (backend/app.py on a temporary SQLite file, or on the
+URL given with --database-url, e.g. a local Postgres). Pointing it at an
+already-running server with --url requires --allow-writes, or --read-only.
+
+Usage:
+    python3 scripts/loadtest.py --concurrency 16 --duration 30
+    python3 scripts/loadtest.py --database-url postgresql://u:p@localhost/loadtest
+    python3 scripts/loadtest.py --url http://localhost:5001 --read-only \\
+        --slo analytics:p95=250 --slo state:p99=100
+
+Concurrent writes to the same day are expected to lose the optimistic version
+check now and then; those 409s are reported as conflicts, not errors.
+
+Exit code is non-zero if any --slo budget is exceeded, the error rate is above
+--max-error-rate, or the server could not be started.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(HERE, os.pardir, "backend")
+
+# Relative weights of each operation in the mix (roughly what the frontend
+# issues: reads on every page load / calendar page, writes on finish and edit).
+DEFAULT_MIX = {
+    "state": 25,
+    "session": 15,
+    "calendar": 20,
+    "finish": 10,
+    "edit": 10,
+    "analytics": 20,
+}
+WRITE_OPS = ("finish", "edit")
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already-sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-pct * len(sorted_values) // 100))  # ceil without floats
+    return sorted_values[int(rank) - 1]
+
+
+def parse_slo(spec):
+    """'analytics:p95=250' -> ('analytics', 95, 250.0)."""
+    try:
+        op, rest = spec.split(":", 1)
+        key, budget = rest.split("=", 1)
+        pct = int(key.lower().lstrip("p"))
+        return op, pct, float(budget)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad --slo {spec!r}; expected OP:pNN=MS")
+
+
+class Client:
+    """Tiny JSON-over-HTTP helper on top of urllib (no extra dependencies)."""
+
+    def __init__(self, base_url, timeout):
+        self.base = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base + path, data=data, method=method)
+        if data is not None:
+            req.add_header("Content-Type", "application/json")
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                resp.read()
+                return resp.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+    def get_json(self, path):
+        with urllib.request.urlopen(self.base + path, timeout=self.timeout) as resp:
+            return json.loads(resp.read())
+
+
+class Workload:
+    """Builds the request for each operation. Shared across worker threads."""
+
+    def __init__(self, today, max_apps):
+        self.today = today
+        self.year, self.month = int(today[:4]), int(today[5:7])
+        self.max_apps = max_apps
+        self._finishes = itertools.count(1)
+
+    def build(self, op):
+        if op == "state":
+            return "GET", "/api/state", None
+        if op == "session":
+            return "GET", f"/api/session/{self.today}", None
+        if op == "calendar":
+            # Mostly the current month, sometimes paging back like a user would.
+            back = random.choice((0, 0, 0, 1, 2))
+            month, year = self.month - back, self.year
+            if month < 1:
+                month, year = month + 12, year - 1
+            return "GET", f"/api/calendar_data?month={month}&year={year}", None
+        if op == "finish":
+            n = min(next(self._finishes), self.max_apps)
+            apps = [{"jobName": f"Engineer {i}", "company": f"Company {i % 37}", "resume": "v1"}
+                    for i in range(n)]
+            return "POST", "/api/finish_day", {
+                "completedCount": n, "elapsedSeconds": 60 * n, "applications": apps,
+            }
+        if op == "edit":
+            return "PUT", f"/api/logs/{self.today}", {"notes": f"load test {random.random():.6f}"}
+        if op == "analytics":
+            return "GET", "/api/analytics", None
+        raise ValueError(op)
+
+
+def run_load(client, workload, mix, concurrency, duration, total_requests):
+    """Run workers until the deadline / request budget is hit. Returns
+    ({op: [latency_ms, ...]}, {op: error_count}, {op: conflict_count}, wall_seconds)."""
+    ops, weights = zip(*mix.items())
+    latencies = {op: [] for op in ops}
+    errors = {op: 0 for op in ops}
+    conflicts = {op: 0 for op in ops}
+    lock = threading.Lock()
+    issued = itertools.count()
+    deadline = time.monotonic() + duration if duration else None
+
+    def worker():
+        rng = random.Random()
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            if total_requests is not None and next(issued) >= total_requests:
+                return
+            op = rng.choices(ops, weights)[0]
+            method, path, body = workload.build(op)
+            started = time.perf_counter()
+            try:
+                status = client.request(method, path, body)
+            except (urllib.error.URLError, OSError):
+                status = None
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies[op].append(elapsed_ms)
+                if status == 409:
+                    conflicts[op] += 1
+                elif status is None or status >= 400:
+                    errors[op] += 1
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors, conflicts, time.perf_counter() - started
+
+
+def report(latencies, errors, conflicts, wall):
+    """Print the per-endpoint latency/throughput table."""
+    stats = {}
+    header = f"{'endpoint':<10} {'count':>7} {'errors':>6} {'409s':>6} {'req/s':>8} " + \
+        " ".join(f"{'p%d' % p:>8}" for p in PERCENTILES) + f" {'max':>8}"
+    print(header)
+    print("-" * len(header))
+    all_latencies = []
+    for op, values in latencies.items():
+        values = sorted(values)
+        all_latencies.extend(values)
+        stats[op] = {p: percentile(values, p) for p in PERCENTILES}
+        print(f"{op:<10} {len(values):>7} {errors[op]:>6} {conflicts[op]:>6} {len(values) / wall:>8.1f} "
+              + " ".join(f"{stats[op][p]:>8.1f}" for p in PERCENTILES)
+              + f" {(values[-1] if values else 0):>8.1f}")
+    all_latencies.sort()
+    total = len(all_latencies)
+    print("-" * len(header))
+    print(f"{'total':<10} {total:>7} {sum(errors.values()):>6} {sum(conflicts.values()):>6} {total / wall:>8.1f} "
+          + " ".join(f"{percentile(all_latencies, p):>8.1f}" for p in PERCENTILES)
+          + f" {(all_latencies[-1] if all_latencies else 0):>8.1f}")
+    print(f"\nLatencies in ms over {wall:.1f}s wall time.")
+
+
+def start_server(database_url, port):
+    """Start backend/app.py on `port`; returns (process, tmpdir_or_None)."""
+    tmpdir = None
+    if not database_url:
+        tmpdir = tempfile.mkdtemp(prefix="jobtracker-load-")
+        database_url = "sqlite:///" + os.path.join(tmpdir, "loadtest.db")
+    env = dict(os.environ, DATABASE_URL=database_url, PORT=str(port))
+    env.pop("FLASK_ENV", None)  # never run the reloader/debugger under load
+    proc = subprocess.Popen(
+        [sys.executable, "app.py"], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return proc, tmpdir
+
+
+def wait_healthy(client, proc, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            return False
+        try:
+            if client.request("GET", "/api/health") == 200:
+                return True
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="Base URL of an already-running server (skips starting one)")
+    parser.add_argument("--database-url", help="DATABASE_URL for the started server (default: temp SQLite file)")
+    parser.add_argument("--port", type=int, default=5099, help="Port for the started server (default 5099)")
+    parser.add_argument("--concurrency", "-c", type=int, default=8, help="Worker threads (default 8)")
+    parser.add_argument("--duration", "-d", type=float, default=20.0, help="Seconds to run (default 20)")
+    parser.add_argument("--requests", "-n", type=int, help="Stop after this many requests instead")
+    parser.add_argument("--max-apps", type=int, default=300,
+                        help="Cap on the growing finish_day application list (default 300)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--read-only", action="store_true", help="Drop finish/edit from the mix")
+    parser.add_argument("--allow-writes", action="store_true",
+                        help="Allow finish/edit against --url (overwrites today's log!)")
+    parser.add_argument("--slo", type=parse_slo, action="append", default=[], metavar="OP:pNN=MS",
+                        help="Latency budget, e.g. analytics:p95=250 (repeatable)")
+    parser.add_argument("--max-error-rate", type=float, default=0.0,
+                        help="Fail if more than this fraction of requests error (default 0)")
+    args = parser.parse_args()
+
+    mix = dict(DEFAULT_MIX)
+    if args.url and not (args.read_only or args.allow_writes):
+        parser.error("--url needs --read-only or --allow-writes (finish/edit overwrite today's log)")
+    if args.read_only:
+        for op in WRITE_OPS:
+            mix.pop(op)
+    for op, _pct, _ms in args.slo:
+        if op not in mix:
+            parser.error(f"--slo names unknown or disabled endpoint {op!r}; choose from {', '.join(mix)}")
+
+    proc = tmpdir = None
+    if args.url:
+        client = Client(args.url, args.timeout)
+    else:
+        proc, tmpdir = start_server(args.database_url, args.port)
+        client = Client(f"http://127.0.0.1:{args.port}", args.timeout)
+    try:
+        if not wait_healthy(client, proc):
+            print("Server did not become healthy.", file=sys.stderr)
+            return 2
+        today = client.get_json("/api/server_time")["date"]
+        workload = Workload(today, args.max_apps)
+        if "edit" in mix:
+            # PUT /api/logs/<today> 404s until the day exists.
+            method, path, body = workload.build("finish")
+            client.request(method, path, body)
+
+        print(f"Running {args.concurrency} workers for "
+              f"{f'{args.requests} requests' if args.requests else f'{args.duration:g}s'} "
+              f"against {client.base} (mix: {', '.join(f'{k}={v}' for k, v in mix.items())})\n")
+        latencies, errors, conflicts, wall = run_load(
+            client, workload, mix, args.concurrency,
+            None if args.requests else args.duration, args.requests,
+        )
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    report(latencies, errors, conflicts, wall)
+
+    failures = []
+    for op, pct, budget in args.slo:
+        observed = percentile(sorted(latencies[op]), pct)
+        if observed > budget:
+            failures.append(f"{op} p{pct} = {observed:.1f}ms exceeds budget {budget:g}ms")
+    total = sum(len(v) for v in latencies.values())
+    error_rate = sum(errors.values()) / total if total else 1.0
+    if error_rate > args.max_error_rate:
+        failures.append(f"error rate {error_rate:.2%} exceeds {args.max_error_rate:.2%}")
+
+    if failures:
+        print("\nSLO FAILED:\n  " + "\n  ".join(failures), file=sys.stderr)
+        return 1
+    print("\nAll SLOs met." if args.slo else "")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())